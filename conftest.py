@@ -0,0 +1,15 @@
+import shutil
+import tempfile
+
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def temp_cache():
+    """pytest тоже не пишет в файл кэша dev-сервера."""
+    from core.testing import temp_cache_settings
+
+    directory = tempfile.mkdtemp()
+    with temp_cache_settings(directory):
+        yield
+    shutil.rmtree(directory, ignore_errors=True)
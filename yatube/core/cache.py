@@ -0,0 +1,269 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats SET entries = entries - 1, bytes = bytes - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN
+    UPDATE cache_stats SET bytes = bytes - OLD.size + NEW.size;
+END;
+'''
+
+# SQLite ограничивает число параметров в одном запросе.
+MAX_PARAMS = 900
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в файле SQLite, общий для всех процессов на одном хосте.
+
+    Вытесняет давно не читавшиеся записи (LRU), когда превышены
+    MAX_ENTRIES или MAX_SIZE байт; incr и add атомарны между процессами.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._max_size = int(options.get('MAX_SIZE', 64 * 1024 * 1024))
+        # Время последнего чтения обновляется не чаще раза в секунду,
+        # чтобы get почти никогда не писал в базу.
+        self._lru_resolution = float(options.get('LRU_RESOLUTION', 1))
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                timeout=self._busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute('PRAGMA recursive_triggers = ON')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _dump(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _row(self, key, value, timeout, now):
+        blob = self._dump(value)
+        return (key, blob, self.get_backend_timeout(timeout), now,
+                len(key) + len(blob))
+
+    def _insert(self, db, rows):
+        db.executemany(
+            'INSERT OR REPLACE INTO cache (key, value, expires, accessed, '
+            'size) VALUES (?, ?, ?, ?, ?)',
+            rows,
+        )
+        self._cull(db)
+
+    def _stats(self, db):
+        return db.execute('SELECT entries, bytes FROM cache_stats').fetchone()
+
+    def _fits(self, entries, size):
+        return entries <= self._max_entries and size <= self._max_size
+
+    def _cull(self, db):
+        if self._fits(*self._stats(db)):
+            return
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        entries, size = self._stats(db)
+        if self._fits(entries, size):
+            return
+        if self._cull_frequency == 0:
+            db.execute('DELETE FROM cache')
+            return
+        # Одной порции может не хватить: set_many далеко за MAX_ENTRIES или
+        # крупная запись сверх MAX_SIZE. Вытесняем, пока не уложимся.
+        while not self._fits(entries, size):
+            db.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (max(entries // self._cull_frequency, 1),),
+            )
+            entries, size = self._stats(db)
+
+    def _fetch(self, keys):
+        db = self._db
+        now = time.time()
+        found, expired, stale = {}, [], []
+        for start in range(0, len(keys), MAX_PARAMS):
+            chunk = keys[start:start + MAX_PARAMS]
+            rows = db.execute(
+                'SELECT key, value, expires, accessed FROM cache '
+                'WHERE key IN (%s)' % ', '.join('?' * len(chunk)),
+                chunk,
+            )
+            for key, blob, expires, accessed in rows:
+                if expires is not None and expires <= now:
+                    expired.append(key)
+                    continue
+                found[key] = pickle.loads(blob)
+                if accessed < now - self._lru_resolution:
+                    stale.append((now, key))
+        if expired or stale:
+            with self._transaction() as db:
+                self._delete_keys(db, expired, expired_only=True)
+                db.executemany(
+                    'UPDATE cache SET accessed = ? WHERE key = ?', stale
+                )
+        return found
+
+    def _delete_keys(self, db, keys, expired_only=False):
+        deleted = 0
+        condition = ' AND expires <= %f' % time.time() if expired_only else ''
+        for start in range(0, len(keys), MAX_PARAMS):
+            chunk = keys[start:start + MAX_PARAMS]
+            deleted += db.execute(
+                'DELETE FROM cache WHERE key IN (%s)%s'
+                % (', '.join('?' * len(chunk)), condition),
+                chunk,
+            ).rowcount
+        return deleted
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        made = {self._key(key, version): key for key in keys}
+        return {
+            made[key]: value
+            for key, value in self._fetch(list(made)).items()
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        row = self._row(self._key(key, version), value, timeout, time.time())
+        with self._transaction() as db:
+            self._insert(db, [row])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        now = time.time()
+        rows = [
+            self._row(self._key(key, version), value, timeout, now)
+            for key, value in data.items()
+        ]
+        with self._transaction() as db:
+            self._insert(db, rows)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        now = time.time()
+        row = self._row(self._key(key, version), value, timeout, now)
+        with self._transaction() as db:
+            exists = db.execute(
+                'SELECT 1 FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (row[0], now),
+            ).fetchone()
+            if exists:
+                return False
+            self._insert(db, [row])
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            return db.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            ).rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            blob = self._dump(value)
+            db.execute(
+                'UPDATE cache SET value = ?, size = ? WHERE key = ?',
+                (blob, len(key) + len(blob), key),
+            )
+        return value
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._db.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        return self.delete_many([key], version) == 1
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if not keys:
+            return 0
+        with self._transaction() as db:
+            return self._delete_keys(db, keys)
+
+    def clear(self):
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache')
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE: блокировка на запись берётся сразу, без гонок."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
@@ -0,0 +1,82 @@
+import gzip
+import io
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def gzip_bytes(data, level=9):
+    # mtime=0: одинаковый файл всегда даёт одинаковые байты.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=level,
+                       mtime=0) as packed:
+        packed.write(data)
+    return buffer.getvalue()
+
+
+def encoders(best=False):
+    """(кодировка, суффикс файла, функция сжатия) в порядке предпочтения.
+
+    best — максимальное сжатие для статики, которая сжимается один раз;
+    иначе уровни, которые успевают сжать страницу на лету.
+    """
+    found = []
+    if brotli is not None:
+        quality = 11 if best else 5
+        found.append(('br', '.br', lambda data: brotli.compress(
+            data, quality=quality
+        )))
+    if zstandard is not None:
+        level = 19 if best else 3
+        # Компрессор zstandard нельзя делить между потоками.
+        found.append(('zstd', '.zst', lambda data: zstandard.ZstdCompressor(
+            level=level
+        ).compress(data)))
+    level = 9 if best else 6
+    found.append(('gzip', '.gz', lambda data: gzip_bytes(data, level)))
+    return found
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с их q, кроме запрещённых (q=0)."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        name, _, value = params.partition('=')
+        quality = 1.0
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                continue
+        if quality > 0:
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def preferred(header):
+    """Доступные кодировки, которые понимает клиент, от лучшей к худшей.
+
+    Решает q клиента; при равных q — порядок encoders() (br, zstd, gzip).
+    """
+    accepted = accepted_encodings(header)
+    ranked = [
+        (-accepted[encoder[0]], position, encoder)
+        for position, encoder in enumerate(encoders())
+        if encoder[0] in accepted
+    ]
+    return [encoder for _, _, encoder in sorted(ranked)]
+
+
+def negotiate(header):
+    """Лучшая из доступных кодировок, которую понимает клиент."""
+    for encoding, _, compress in preferred(header):
+        return encoding, compress
+    return None, None
@@ -0,0 +1,78 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Порядок важен: busy_timeout должен действовать уже при переключении
+# журнала, а journal_mode — до первой записи.
+PRAGMA_ORDER = (
+    'busy_timeout',
+    'journal_mode',
+    'synchronous',
+    'mmap_size',
+    'cache_size',
+    'temp_store',
+)
+
+METRICS = ('locked', 'slow_writes', 'slow_write_ms')
+METRICS_KEY = 'sqlite_metrics:'
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def pragmas():
+    """PRAGMA из settings.SQLITE_PRAGMAS в порядке применения."""
+    configured = settings.SQLITE_PRAGMAS
+    return [(name, configured[name]) for name in PRAGMA_ORDER
+            if configured.get(name) is not None]
+
+
+def record(metric, value=1):
+    metrics.record(METRICS_KEY, metric, value)
+
+
+def lock_metrics():
+    return metrics.read(METRICS_KEY, METRICS)
+
+
+def reset_lock_metrics():
+    metrics.reset(METRICS_KEY, METRICS)
+
+
+def monitor_locks(execute, sql, params, many, context):
+    """Считает запросы, упавшие на блокировке или долго ждавшие записи.
+
+    В режиме WAL читатели не мешают писателям, поэтому долгая запись
+    почти всегда означает ожидание чужой транзакции.
+    """
+    started = time.monotonic()
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError as error:
+        if 'locked' in str(error) or 'busy' in str(error):
+            record('locked')
+            logger.warning('SQLite занята: %s', sql[:200])
+        raise
+    finally:
+        elapsed = time.monotonic() - started
+        if (elapsed >= settings.SQLITE_SLOW_WRITE
+                and sql.lstrip().upper().startswith(WRITE_STATEMENTS)):
+            record('slow_writes')
+            record('slow_write_ms', int(elapsed * 1000))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in pragmas():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+    if monitor_locks not in connection.execute_wrappers:
+        connection.execute_wrappers.append(monitor_locks)
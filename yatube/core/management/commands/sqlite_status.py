@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.db import lock_metrics, pragmas, reset_lock_metrics
+
+
+class Command(BaseCommand):
+    help = 'Показывает PRAGMA соединения SQLite и счётчики блокировок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true')
+
+    def handle(self, reset, **options):
+        with connection.cursor() as cursor:
+            for name, _ in pragmas():
+                cursor.execute(f'PRAGMA {name}')
+                self.stdout.write(f'{name}: {cursor.fetchone()[0]}')
+        for metric, value in lock_metrics().items():
+            self.stdout.write(f'{metric}: {value}')
+        if reset:
+            reset_lock_metrics()
@@ -0,0 +1,40 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в файлы реплик.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Реплики для обновления, по умолчанию DATABASE_REPLICAS.',
+        )
+
+    def handle(self, aliases, **options):
+        aliases = aliases or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Реплики не настроены: DATABASE_REPLICAS.')
+        source = sqlite3.connect(connections[PRIMARY].settings_dict['NAME'])
+        try:
+            for alias in aliases:
+                if alias not in settings.DATABASES or alias == PRIMARY:
+                    raise CommandError(f'Неизвестная реплика: {alias}.')
+                # Онлайн-копия через backup API: согласованный снимок без
+                # остановки записи и без подмены файла под открытыми
+                # соединениями реплики.
+                target = sqlite3.connect(
+                    connections[alias].settings_dict['NAME']
+                )
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: обновлена')
+        finally:
+            source.close()
@@ -0,0 +1,20 @@
+from django.core.cache import cache
+
+
+def record(prefix, metric, value=1):
+    """Счётчики в общем кэше, чтобы их видели все процессы."""
+    key = prefix + metric
+    if not cache.add(key, value, None):
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.set(key, value, None)
+
+
+def read(prefix, metrics):
+    found = cache.get_many([prefix + metric for metric in metrics])
+    return {metric: found.get(prefix + metric, 0) for metric in metrics}
+
+
+def reset(prefix, metrics):
+    cache.delete_many([prefix + metric for metric in metrics])
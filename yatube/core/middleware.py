@@ -0,0 +1,106 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .compression import negotiate
+from .routers import allow_replica_reads, wrote
+
+STICKY_COOKIE = 'use_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+COMPRESSED_KEY = 'compressed:'
+
+
+class ReplicaStickinessMiddleware:
+    """Read-your-writes поверх ReplicaRouter.
+
+    Безопасные запросы читают с реплик. Запрос, который что-то записал,
+    ставит cookie, и следующие REPLICA_STICKY_SECONDS секунд браузер
+    читает с основной базы: свой новый пост или комментарий пользователь
+    видит сразу, даже пока реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        allow_replica_reads(
+            request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+            if wrote():
+                response.set_cookie(
+                    STICKY_COOKIE, '1',
+                    max_age=settings.REPLICA_STICKY_SECONDS,
+                    httponly=True,
+                )
+        finally:
+            allow_replica_reads(False)
+        return response
+
+
+class CompressionMiddleware:
+    """Сжимает ответы лучшей кодировкой из Accept-Encoding (br, zstd,
+    gzip) и ставит слабый ETag по несжатому содержимому.
+
+    Маленькие, потоковые и уже сжатые ответы не трогаются. Сжатые байты
+    ответов анонимам хранятся в кэше по ETag: одна и та же лента
+    сжимается один раз, пока не изменится. Страницы вошедших
+    пользователей уникальны (CSRF-токен), их сжимаем без кэша.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        digest = hashlib.sha1(response.content).hexdigest()
+        etag = response.get('ETag', f'"{digest}"')
+        if not etag.startswith('W/'):
+            # Сжатые и несжатые байты отличаются, совпадает только смысл.
+            response['ETag'] = etag = 'W/' + etag
+        conditional = get_conditional_response(
+            request, etag=etag, response=response
+        )
+        if conditional is not response:
+            return conditional
+        encoding, compress = negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        key = f'{COMPRESSED_KEY}{encoding}:{digest}'
+        shared = (response.status_code == 200 and not response.cookies
+                  and settings.SESSION_COOKIE_NAME not in request.COOKIES)
+        content = cache.get(key) if shared else None
+        if content is None:
+            content = compress(response.content)
+            if len(content) >= len(response.content):
+                return response
+            if shared:
+                cache.set(key, content, settings.COMPRESSION_CACHE_TIMEOUT)
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compressible(self, response):
+        return (
+            not response.streaming
+            and not response.has_header('Content-Encoding')
+            and len(response.content) >= settings.COMPRESSION_MIN_BYTES
+            and response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_TYPES
+            )
+            and 'no-transform' not in response.get('Cache-Control', '')
+        )
@@ -0,0 +1,55 @@
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+# Сессии читаются только с основной базы: иначе отставшая реплика
+# «разлогинит» пользователя сразу после входа.
+PRIMARY_ONLY_APPS = ('sessions',)
+
+_state = threading.local()
+
+
+def allow_replica_reads(allowed):
+    """Разрешает читать с реплик в текущем потоке (делает middleware)."""
+    _state.replica_reads = allowed
+    _state.wrote = False
+
+
+def use_primary():
+    """До конца текущего запроса читать только с основной базы."""
+    _state.replica_reads = False
+
+
+def wrote():
+    """Была ли в текущем запросе запись в основную базу."""
+    return getattr(_state, 'wrote', False)
+
+
+class ReplicaRouter:
+    """Чтение с реплик из settings.DATABASE_REPLICAS, запись в default.
+
+    Вне запросов и после первой записи в запросе всё читается с основной
+    базы, чтобы код видел только что сохранённые данные.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (not replicas or wrote()
+                or not getattr(_state, 'replica_reads', False)
+                or model._meta.app_label in PRIMARY_ONLY_APPS):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in PRIMARY_ONLY_APPS:
+            _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
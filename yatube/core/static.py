@@ -0,0 +1,102 @@
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compression import encoders, preferred
+
+# Что имеет смысл сжимать; картинки и шрифты уже сжаты.
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map',
+                '.xml', '.html')
+# Сжатая копия, выигрывающая меньше, не стоит лишнего файла.
+MIN_SAVING = 0.05
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Хэши в именах файлов плюс сжатые копии (.gz, а если стоят brotli и
+    zstandard — ещё .br и .zst), собранные при collectstatic.
+
+    Если манифеста нет или файла в нём нет (collectstatic ещё не
+    запускали, тесты), адрес выдаётся без хэша вместо ошибки 500.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.lower().endswith(COMPRESSIBLE):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        for _, suffix, compress in encoders(best=True):
+            path = self.path(name + suffix)
+            packed = compress(data)
+            if len(packed) <= len(data) * (1 - MIN_SAVING):
+                with open(path, 'wb') as target:
+                    target.write(packed)
+            elif os.path.exists(path):
+                os.remove(path)
+
+    def is_immutable(self, name):
+        """Имя с хэшем из манифеста: содержимое по нему не меняется."""
+        if not hasattr(self, '_immutable'):
+            self._immutable = set(self.hashed_files.values())
+        return name in self._immutable
+
+
+def serve(request, path):
+    """Отдаёт собранную статику из STATIC_ROOT, сразу сжатой копией.
+
+    Файлы с хэшем в имени кэшируются браузером навсегда.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(settings.STATIC_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404(path)
+    content_type, _ = mimetypes.guess_type(fullpath)
+    encoding = None
+    for coding, suffix, _ in preferred(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    ):
+        if os.path.isfile(fullpath + suffix):
+            encoding, fullpath = coding, fullpath + suffix
+            break
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                              stat.st_mtime, stat.st_size):
+        return HttpResponseNotModified()
+    response = FileResponse(
+        open(fullpath, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if path.lower().endswith(COMPRESSIBLE):
+        response['Vary'] = 'Accept-Encoding'
+    is_immutable = getattr(staticfiles_storage, 'is_immutable', None)
+    response['Cache-Control'] = (
+        IMMUTABLE if is_immutable and is_immutable(path) else REVALIDATE
+    )
+    return response
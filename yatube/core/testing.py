@@ -0,0 +1,35 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def temp_cache_settings(directory):
+    """override_settings, переносящий все кэши в каталог directory."""
+    return override_settings(CACHES={
+        alias: dict(config, LOCATION=os.path.join(
+            directory, f'{alias}.sqlite3'
+        ))
+        for alias, config in settings.CACHES.items()
+    })
+
+
+class TempCacheRunner(DiscoverRunner):
+    """Тесты пишут кэш во временный каталог, а не в файл dev-сервера.
+
+    Для pytest то же делает фикстура в conftest.py в корне репозитория.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_directory = tempfile.mkdtemp()
+        self.cache_settings = temp_cache_settings(self.cache_directory)
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
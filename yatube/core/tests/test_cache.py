@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from ..cache import SQLiteCache
+
+INCREMENTS = 100
+
+
+def make_cache(path, **options):
+    return SQLiteCache(path, {'OPTIONS': options})
+
+
+def increment(path):
+    cache = make_cache(path)
+    for _ in range(INCREMENTS):
+        cache.incr('counter')
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = make_cache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_basic_operations(self):
+        """Кэш хранит, добавляет, удаляет и истекает записи."""
+        self.cache.set('key', {'value': 1})
+        self.assertEqual(self.cache.get('key'), {'value': 1})
+        self.assertFalse(self.cache.add('key', 'other'))
+        self.assertTrue(self.cache.add('new', 'value'))
+        self.cache.set('expired', 'value', -1)
+        self.assertIsNone(self.cache.get('expired'))
+        self.assertEqual(
+            self.cache.get_many(['key', 'new', 'missing']),
+            {'key': {'value': 1}, 'new': 'value'},
+        )
+        self.assertEqual(self.cache.delete_many(['key', 'new']), 2)
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_shared_between_instances(self):
+        """Запись видна другому экземпляру на том же файле."""
+        self.cache.set('key', 'value')
+        self.assertEqual(make_cache(self.path).get('key'), 'value')
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняются давно не читавшиеся записи."""
+        cache = make_cache(
+            self.path, MAX_ENTRIES=4, CULL_FREQUENCY=2, LRU_RESOLUTION=0
+        )
+        for key in 'abcd':
+            cache.set(key, key)
+        cache.get('a')
+        cache.set('e', 'e')
+        self.assertEqual(sorted(cache.get_many('abcde')), ['a', 'd', 'e'])
+
+    def test_size_cap(self):
+        """Суммарный размер записей не превышает MAX_SIZE."""
+        cache = make_cache(self.path, MAX_SIZE=10000)
+        for i in range(20):
+            cache.set(f'key{i}', 'x' * 1000)
+        self.assertLess(len(cache.get_many(f'key{i}' for i in range(20))), 10)
+
+    def test_cull_until_within_limits(self):
+        """Вытеснение идёт, пока не уложится и в число, и в размер."""
+        cache = make_cache(
+            self.path, MAX_ENTRIES=10, MAX_SIZE=10000, CULL_FREQUENCY=10
+        )
+        cache.set_many({f'key{i}': 'x' for i in range(30)})
+        entries, size = cache._stats(cache._db)
+        self.assertLessEqual(entries, 10)
+        cache.set('large', 'x' * 9000)
+        entries, size = cache._stats(cache._db)
+        self.assertLessEqual(size, 10000)
+        self.assertEqual(cache.get('large'), 'x' * 9000)
+
+    def test_tests_use_own_file(self):
+        """Тесты не пишут в файл кэша dev-сервера."""
+        self.assertNotEqual(
+            caches['default']._path,
+            os.path.join(settings.BASE_DIR, 'cache', 'default.sqlite3'),
+        )
+
+    def test_incr_is_atomic_across_processes(self):
+        """incr не теряет обновления при конкурентных процессах."""
+        self.cache.set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=increment, args=(self.path,))
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.cache.get('counter'), 3 * INCREMENTS)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+
+import brotli
+import zstandard
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from ..compression import accepted_encodings, negotiate
+from ..middleware import COMPRESSED_KEY, CompressionMiddleware
+
+User = get_user_model()
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, **headers):
+        return self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', **headers)
+
+    def test_feed_compressed(self):
+        """Лента уходит сжатой и распаковывается в ту же страницу."""
+        plain = self.client.get(reverse('posts:index'))
+        response = self.get(reverse('posts:index'))
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], plain['ETag'])
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+    def test_brotli_and_zstd(self):
+        """br и zstd выбираются по заголовку и дают ту же страницу."""
+        plain = self.client.get(reverse('posts:index'))
+        decoders = {
+            'br': brotli.decompress,
+            'zstd': zstandard.ZstdDecompressor().decompress,
+        }
+        for encoding, decompress in decoders.items():
+            with self.subTest(encoding=encoding):
+                response = self.client.get(
+                    reverse('posts:index'),
+                    HTTP_ACCEPT_ENCODING=f'gzip;q=0.5, {encoding}',
+                )
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(
+                    decompress(response.content), plain.content
+                )
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip, zstd, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+    def test_not_modified(self):
+        """Совпавший ETag даёт 304 без тела."""
+        etag = self.get(reverse('posts:index'))['ETag']
+        response = self.get(reverse('posts:index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def cache_key(self, response):
+        digest = hashlib.sha1(gzip.decompress(response.content)).hexdigest()
+        return f'{COMPRESSED_KEY}gzip:{digest}'
+
+    def test_cache_hit_not_recompressed(self):
+        """Повторный анонимный запрос берёт сжатые байты из кэша."""
+        response = self.get(reverse('posts:index'))
+        key = self.cache_key(response)
+        self.assertEqual(cache.get(key), response.content)
+        cache.set(key, b'cached')
+        self.assertEqual(self.get(reverse('posts:index')).content, b'cached')
+
+    def test_logged_in_not_cached(self):
+        """Страницы вошедшего пользователя сжимаются без кэша."""
+        self.client.force_login(User.objects.create_user(username='reader'))
+        response = self.get(reverse('posts:index'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIsNone(cache.get(self.cache_key(response)))
+
+    def test_skipped_responses(self):
+        """Маленькие, не текстовые и уже сжатые ответы не трогаются."""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        encoded = HttpResponse('x' * 1000)
+        encoded['Content-Encoding'] = 'identity'
+        for response in (HttpResponse('short'),
+                         HttpResponse(b'x' * 1000, content_type='image/png'),
+                         encoded):
+            result = CompressionMiddleware(lambda request: response)(request)
+            self.assertNotEqual(result.get('Content-Encoding'), 'gzip')
+            self.assertNotIn('ETag', result)
+
+    def test_negotiation(self):
+        """Учитываются q=0 и доступные кодировки."""
+        self.assertEqual(
+            accepted_encodings('br;q=0, gzip;q=0.5, identity'),
+            {'gzip': 0.5, 'identity': 1.0},
+        )
+        self.assertEqual(negotiate('gzip;q=0, identity'), (None, None))
+        self.assertEqual(negotiate('deflate, gzip')[0], 'gzip')
+
+    def test_client_quality_wins(self):
+        """q клиента важнее порядка сервера; он решает только при равных."""
+        self.assertEqual(negotiate('br;q=0.1, gzip;q=1')[0], 'gzip')
+        self.assertEqual(negotiate('gzip;q=0.8, zstd;q=0.9, br;q=0.5')[0],
+                         'zstd')
+        self.assertEqual(negotiate('gzip, zstd, br')[0], 'br')
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='br;q=0.1, gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection, OperationalError
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings, SimpleTestCase, TestCase
+
+from ..db import lock_metrics, monitor_locks
+
+
+class SQLitePragmasTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Новое соединение получает PRAGMA из настроек."""
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('temp_store'), 2)
+        self.assertIn(monitor_locks, connection.execute_wrappers)
+
+
+class SQLiteConcurrencyTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        settings_dict = dict(
+            connection.settings_dict,
+            NAME=os.path.join(self.directory, 'db.sqlite3'),
+        )
+        self.writer = DatabaseWrapper(settings_dict, alias='writer')
+        self.reader = DatabaseWrapper(settings_dict, alias='reader')
+        cache.clear()
+
+    def tearDown(self):
+        self.writer.close()
+        self.reader.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_readers_do_not_block_writer(self):
+        """В режиме WAL чтение идёт параллельно открытой записи."""
+        with self.writer.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('CREATE TABLE item (value INTEGER)')
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('INSERT INTO item VALUES (1)')
+            with self.reader.cursor() as reader:
+                reader.execute('SELECT COUNT(*) FROM item')
+                self.assertEqual(reader.fetchone()[0], 0)
+            cursor.execute('COMMIT')
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 0})
+    def test_lock_contention_is_counted(self):
+        """Запрос, не дождавшийся блокировки, попадает в метрики."""
+        with self.writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (value INTEGER)')
+            cursor.execute('BEGIN IMMEDIATE')
+            with self.assertRaises(OperationalError), \
+                    self.assertLogs('core.db', 'WARNING'):
+                with self.reader.cursor() as reader:
+                    reader.execute('INSERT INTO item VALUES (1)')
+            cursor.execute('ROLLBACK')
+        self.assertEqual(lock_metrics()['locked'], 1)
@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import override_settings, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.generations import generation_key, get_generations
+from posts.models import Post
+from posts.utils import FeedPaginator
+from ..middleware import ReplicaStickinessMiddleware, STICKY_COOKIE
+from ..routers import allow_replica_reads, PRIMARY, ReplicaRouter
+
+User = get_user_model()
+
+REPLICAS = ('replica1', 'replica2')
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        allow_replica_reads(False)
+
+    def test_reads_outside_requests_use_primary(self):
+        """Вне запроса чтение идёт с основной базы."""
+        self.assertEqual(self.router.db_for_read(Post), PRIMARY)
+
+    def test_write_pins_request_to_primary(self):
+        """После записи запрос читает с основной базы."""
+        allow_replica_reads(True)
+        self.assertIn(self.router.db_for_read(Post), REPLICAS)
+        self.assertEqual(self.router.db_for_read(Session), PRIMARY)
+        self.assertEqual(self.router.db_for_write(Post), PRIMARY)
+        self.assertEqual(self.router.db_for_read(Post), PRIMARY)
+
+    def test_fresh_generation_reads_from_primary(self):
+        """Пока поколение свежее, запрос читает с основной базы."""
+        cache.clear()
+        allow_replica_reads(True)
+        get_generations(('posts',))
+        self.assertEqual(self.router.db_for_read(Post), PRIMARY)
+        synced = settings.REPLICA_STICKY_SECONDS + 1
+        cache.set(
+            generation_key('posts'), time.time_ns() - synced * 10 ** 9, None
+        )
+        allow_replica_reads(True)
+        get_generations(('posts',))
+        self.assertIn(self.router.db_for_read(Post), REPLICAS)
+
+    def test_cached_count_from_primary(self):
+        """Счётчик, который ляжет в кэш пагинатора, берётся с основной."""
+        cache.clear()
+        allow_replica_reads(True)
+        with CaptureQueriesContext(connections[PRIMARY]) as context:
+            self.assertEqual(FeedPaginator(Post.objects.all(), 10).count, 0)
+        self.assertEqual(len(context), 1)
+
+    def run_view(self, request, write=False):
+        aliases = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Post)
+            aliases.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = ReplicaStickinessMiddleware(view)(request)
+        return aliases[0], response
+
+    def test_sticky_cookie_after_write(self):
+        """Записавший браузер какое-то время читает с основной базы."""
+        alias, response = self.run_view(self.factory.get('/'))
+        self.assertIn(alias, REPLICAS)
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        alias, response = self.run_view(self.factory.post('/'), write=True)
+        self.assertEqual(alias, PRIMARY)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        alias, _ = self.run_view(request)
+        self.assertEqual(alias, PRIMARY)
+
+    def test_new_post_sets_sticky_cookie(self):
+        """Публикация поста закрепляет автора за основной базой."""
+        user = User.objects.create_user(username='auth')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('posts:create_post'), {'text': 'Новый пост'}
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
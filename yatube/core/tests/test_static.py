@@ -0,0 +1,109 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+import brotli
+import zstandard
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import override_settings, TestCase
+from django.urls import reverse
+
+from ..static import IMMUTABLE, REVALIDATE
+
+STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CSS = 'css/bootstrap.min.css'
+
+
+def source(name):
+    with open(os.path.join(settings.BASE_DIR, 'static', name), 'rb') as file:
+        return file.read()
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT)
+class StaticPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with override_settings(STATIC_ROOT=STATIC_ROOT):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def get(self, url, encoding='gzip, deflate'):
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        return response, b''.join(response.streaming_content)
+
+    def test_hashed_names_in_templates(self):
+        """Шаблоны ссылаются на статику с хэшем в имени."""
+        css_url = staticfiles_storage.url(CSS)
+        self.assertRegex(css_url, r'bootstrap\.min\.[0-9a-f]{12}\.css$')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, css_url)
+        self.assertContains(
+            response, staticfiles_storage.url('img/fav/favicon.ico')
+        )
+
+    def test_precompressed_immutable(self):
+        """Хэшированный файл отдаётся сжатой копией и кэшируется навсегда."""
+        response, body = self.get(staticfiles_storage.url(CSS))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(body), source(CSS))
+
+    def test_brotli_and_zstd_copies(self):
+        """collectstatic пишет .br и .zst, и они отдаются по заголовку."""
+        hashed = staticfiles_storage.stored_name(CSS)
+        decoders = {
+            'br': ('.br', brotli.decompress),
+            'zstd': ('.zst', zstandard.ZstdDecompressor().decompress),
+        }
+        for encoding, (suffix, decompress) in decoders.items():
+            with self.subTest(encoding=encoding):
+                self.assertTrue(os.path.exists(
+                    os.path.join(STATIC_ROOT, hashed + suffix)
+                ))
+                response, body = self.get(
+                    staticfiles_storage.url(CSS), f'gzip, {encoding}'
+                )
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(decompress(body), source(CSS))
+
+    def test_client_quality_respected(self):
+        """Сжатая копия выбирается по q клиента."""
+        response, body = self.get(
+            staticfiles_storage.url(CSS), 'br;q=0.1, gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body), source(CSS))
+
+    def test_plain_name_revalidated(self):
+        """Файл без хэша и без сжатия браузер перепроверяет."""
+        response, body = self.get(settings.STATIC_URL + CSS, 'identity')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Cache-Control'], REVALIDATE)
+        self.assertEqual(body, source(CSS))
+
+    def test_missing_file(self):
+        """Неизвестный файл — 404, выход за STATIC_ROOT — 400."""
+        for path, status in (('css/missing.css', 404),
+                             ('../settings.py', 400)):
+            response = self.client.get(settings.STATIC_URL + path)
+            self.assertEqual(response.status_code, status)
+
+
+class LenientManifestTest(TestCase):
+    @override_settings(STATIC_ROOT=tempfile.gettempdir())
+    def test_no_manifest(self):
+        """Без манифеста адрес остаётся без хэша, а не падает."""
+        self.assertEqual(
+            staticfiles_storage.url(CSS), settings.STATIC_URL + CSS
+        )
@@ -1,6 +1,55 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import models
 
+from .bulk import move_to_group
+from .forms import UploadedImageField
 from .models import Group, Post
+from .search import filter_posts
+from .uploads import limited_image_uploads
+from .utils import FeedPaginator
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        empty_label='без группы',
+    )
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """Автокомплит, который не перечитывает уже загруженный объект.
+
+    Иначе в list_editable каждая строка делает свой SELECT ради подписи
+    выбранного значения.
+    """
+
+    loaded = None
+
+    def optgroups(self, name, value, attr=None):
+        loaded = self.loaded
+        if loaded is None or {str(v) for v in value} != {str(loaded.pk)}:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, loaded.pk, self.choices.field.label_from_instance(loaded),
+            True, len(options),
+        ))
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Группа строки уже пришла через list_select_related.
+        widget = self.fields['group'].widget
+        getattr(widget, 'widget', widget).loaded = self.instance.group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,14 +61,67 @@ class PostAdmin(admin.ModelAdmin):
         'author',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    # Число строк — из кэша FeedPaginator, без второго COUNT(*) по всей
+    # таблице ради «показать все».
+    paginator = FeedPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('move_to_group',)
+    # Те же лимиты загрузки и нормализация картинки, что и на сайте.
+    formfield_overrides = {
+        models.ImageField: {'form_class': UploadedImageField},
+    }
+
+    def move_to_group(self, request, queryset):
+        group = Group.objects.filter(
+            pk=request.POST.get('group') or None
+        ).first()
+        moved = move_to_group(queryset, group)
+        self.message_user(
+            request, f'Перенесено постов: {moved}', messages.SUCCESS
+        )
+    move_to_group.short_description = 'Перенести в выбранную группу'
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = LoadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_urls(self):
+        urls = super().get_urls()
+        opts = self.model._meta
+        prefix = f'{opts.app_label}_{opts.model_name}'
+        upload_views = {f'{prefix}_add', f'{prefix}_change'}
+        for pattern in urls:
+            if pattern.name in upload_views:
+                pattern.callback = limited_image_uploads(pattern.callback)
+        return urls
+
+    def get_search_results(self, request, queryset, search_term):
+        # Тот же индекс FTS5, что и у публичного поиска, вместо
+        # LIKE '%...%' по всей таблице.
+        if not search_term:
+            return queryset, False
+        return filter_posts(queryset, search_term), False
 
 
 class GroupAdmin(admin.ModelAdmin):
-    pass
+    list_display = ('title', 'slug', 'posts_count')
+    search_fields = ('title', 'slug')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
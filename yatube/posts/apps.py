@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name: str = 'Посты'
+
+    def ready(self):
+        from . import images, invalidation, timeline  # noqa: F401
+        from .search import restore_triggers
+        post_migrate.connect(restore_triggers, sender=self)
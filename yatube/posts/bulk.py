@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .invalidation import posts_keys, purge
+from .models import shift_group_posts
+
+
+def move_to_group(posts, group):
+    """Переносит посты в группу (или убирает из групп) одним UPDATE.
+
+    update() не шлёт сигналов, поэтому счётчики групп и кэш лент
+    поправляются здесь же. Возвращает число перенесённых постов.
+    """
+    if group is None:
+        posts = posts.exclude(group__isnull=True)
+    else:
+        posts = posts.exclude(group=group)
+    with transaction.atomic():
+        posts = posts.order_by()
+        rows = list(posts.values_list('pk', 'author_id'))
+        if not rows:
+            return 0
+        moved_from = list(
+            posts.values('group').annotate(total=Count('pk')).values_list(
+                'group', 'total'
+            )
+        )
+        moved = posts.model.objects.filter(
+            pk__in=[pk for pk, _ in rows]
+        ).update(group=group, updated_at=timezone.now())
+        for group_id, total in moved_from:
+            shift_group_posts(group_id, -total)
+        shift_group_posts(group and group.pk, moved)
+    group_ids = {group_id for group_id, _ in moved_from}
+    group_ids.add(group and group.pk)
+    purge(f'move {moved} posts to group {group and group.pk}',
+          posts_keys(rows, group_ids))
+    return moved
@@ -0,0 +1,72 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .generations import get_generations, render_version
+from .models import Group, Post
+
+User = get_user_model()
+
+
+def make_etag(request, *generations):
+    """ETag страницы без рендеринга: поколения данных плюс зритель.
+
+    CSRF-cookie входит в ключ, потому что страница с формой содержит
+    токен, привязанный к ней, а версия разметки — потому что с новыми
+    шаблонами та же страница выглядит иначе.
+    """
+    user = request.user
+    parts = (
+        render_version(),
+        *generations,
+        user.pk if user.is_authenticated else '-',
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        request.GET.urlencode(),
+    )
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def index_etag(request):
+    return make_etag(
+        request, 'index', *get_generations(('posts',), ('groups',))
+    )
+
+
+def group_etag(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return make_etag(
+        request, 'group', *get_generations(('group', group_id), ('groups',))
+    )
+
+
+def profile_etag(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    scopes = [('author', author_id), ('groups',)]
+    if request.user.is_authenticated:
+        scopes.append(('follow', request.user.pk))
+    return make_etag(request, 'profile', *get_generations(*scopes))
+
+
+def post_etag(request, post_id):
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    return make_etag(
+        request,
+        'post',
+        *get_generations(('post', post_id), ('author', author_id),
+                         ('groups',)),
+    )
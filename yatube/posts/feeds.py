@@ -0,0 +1,41 @@
+from django.conf import settings
+
+from .merge import MergedFeed
+from .models import FEED_DEFERRED_FIELDS, Follow, Post
+from .timeline import TimelineFeed
+
+FOLLOW_FEED_JOIN: str = 'join'
+FOLLOW_FEED_TIMELINE: str = 'timeline'
+FOLLOW_FEED_MERGE: str = 'merge'
+
+
+def feed_queryset():
+    """Общая выборка постов для лент: автор и группа одним запросом."""
+    return Post.objects.select_related('author', 'group').defer(
+        *FEED_DEFERRED_FIELDS
+    )
+
+
+def index_feed():
+    return feed_queryset()
+
+
+def group_feed(group):
+    return feed_queryset().filter(group=group)
+
+
+def profile_feed(author):
+    return feed_queryset().filter(author=author)
+
+
+def follow_feed(user, engine=None):
+    engine = engine or settings.FOLLOW_FEED_ENGINE
+    if engine == FOLLOW_FEED_MERGE:
+        return MergedFeed(
+            Follow.objects.filter(user=user).values_list(
+                'author_id', flat=True
+            )
+        )
+    if engine == FOLLOW_FEED_TIMELINE:
+        return TimelineFeed(user.pk)
+    return feed_queryset().filter(author__following__user=user)
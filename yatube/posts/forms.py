@@ -1,15 +1,37 @@
+from django import forms
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
 from .models import Comment, Post
 from .models import Post
+from .uploads import normalize_image, pixels_error
 
 User = get_user_model()
 
+class UploadedImageField(forms.ImageField):
+    """Показывает отказ LimitedImageUploadHandler, проверяет число
+    пикселей до того, как картинку кто-то станет декодировать, и
+    нормализует принятую картинку перед сохранением."""
+
+    def to_python(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise ValidationError(error, code='upload')
+        image = super().to_python(data)
+        if image is not None:
+            error = pixels_error(*image.image.size)
+            if error:
+                raise ValidationError(error, code='pixels')
+            image = normalize_image(image)
+        return image
+
+
 class PostForm(ModelForm):
     class Meta():
         model = Post
         fields = ('group', 'text', 'image')
+        field_classes = {'image': UploadedImageField}
         labels = {
             'text': 'Текст поста',
             'group': 'Выбор группы',
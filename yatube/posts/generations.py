@@ -0,0 +1,73 @@
+import hashlib
+import os
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+
+from core.routers import use_primary
+
+
+@lru_cache(maxsize=None)
+def templates_digest():
+    """Хэш содержимого всех шаблонов на момент запуска процесса."""
+    digest = hashlib.md5()
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, directory).encode())
+                    with open(path, 'rb') as file:
+                        digest.update(file.read())
+    return digest.hexdigest()[:12]
+
+
+def render_version():
+    """Версия разметки: RENDER_VERSION из настроек или хэш шаблонов.
+
+    Входит в ключи поколений, поэтому после выкладки с новыми шаблонами
+    кэш фрагментов и ETag начинаются заново.
+    """
+    return settings.RENDER_VERSION or templates_digest()
+
+
+def generation_key(*scope):
+    return f'generation:{render_version()}:' + ':'.join(
+        str(part) for part in scope
+    )
+
+
+def new_generation():
+    # Поколение, созданное после сброса или вытеснения ключа, не должно
+    # совпасть ни с одним из прежних.
+    return time.time_ns()
+
+
+def get_generations(*scopes):
+    """Номера поколений данных для ключей кэша, одним обращением к кэшу.
+
+    Сброс поколения — это удаление его ключа (см. posts.invalidation):
+    следующее чтение заведёт новое, заведомо большее значение. Пока
+    поколение моложе REPLICA_STICKY_SECONDS, реплика может ещё не видеть
+    записи, которая его сбросила: запрос дочитывает с основной базы,
+    чтобы в кэш и ETag под новым поколением не попали старые данные.
+    """
+    keys = [generation_key(*scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    missing = [key for key in keys if key not in generations]
+    if missing:
+        for key in missing:
+            cache.add(key, new_generation(), None)
+        generations.update(cache.get_many(missing))
+    fresh = new_generation() - settings.REPLICA_STICKY_SECONDS * 10 ** 9
+    if any(generation > fresh for generation in generations.values()):
+        use_primary()
+    return tuple(generations[key] for key in keys)
+
+
+def get_generation(*scope):
+    return get_generations(scope)[0]
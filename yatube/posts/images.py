@@ -0,0 +1,187 @@
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from PIL import features, Image, ImageOps
+from sorl.thumbnail import get_thumbnail
+
+from .invalidation import post_keys, purge
+from .models import image_name, MediaBlob, Post
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_GEOMETRY: str = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pillow_avif = None
+
+# Ширины вариантов для srcset; пропорции те же, что у миниатюры.
+VARIANT_WIDTHS = (480, 960, 1440)
+VARIANT_RATIO = 339 / 960
+VARIANT_SIZES = '(max-width: 960px) 100vw, 960px'
+VARIANT_DIR = 'posts/variants/'
+# Порядок важен: браузер берёт первый <source>, который понимает.
+VARIANT_FORMATS = (
+    ('AVIF', 'image/avif', 'avif', {'quality': 60}),
+    ('WEBP', 'image/webp', 'webp', {'quality': 80, 'method': 6}),
+)
+
+# Сколько секунд не ставить картинку поста в очередь повторно.
+QUEUED_TIMEOUT = 600
+QUEUED_KEY = 'images_queued:'
+
+_pool = None
+_pool_pid = None
+
+
+def pool():
+    """Пул создаётся лениво и заново в каждом процессе после fork."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def supported_formats():
+    return [
+        variant for variant in VARIANT_FORMATS
+        if variant[0] in Image.SAVE
+        and (variant[0] != 'WEBP' or features.check('webp'))
+    ]
+
+
+def save_variant(data, width, extension):
+    """Имя из хэша содержимого: одинаковые файлы не дублируются, а
+    новый файл получает новый адрес и кэшируется навсегда."""
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    name = f'{VARIANT_DIR}{digest}-{width}.{extension}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def render_variants(image):
+    """Кадрирует картинку как миниатюру и кодирует её в нескольких
+    ширинах и форматах. Возвращает JSON для Post.image_variants и имена
+    сохранённых файлов."""
+    image.open('rb')
+    try:
+        with Image.open(image) as opened:
+            source = opened.convert(
+                'RGBA' if 'A' in opened.getbands() else 'RGB'
+            )
+    finally:
+        image.close()
+    widths = [
+        width for width in VARIANT_WIDTHS if width <= source.width
+    ] or VARIANT_WIDTHS[:1]
+    frames = {
+        width: ImageOps.fit(
+            source, (width, round(width * VARIANT_RATIO)), Image.LANCZOS
+        )
+        for width in widths
+    }
+    sources = []
+    names = []
+    for pil_format, mime_type, extension, options in supported_formats():
+        srcset = []
+        for width, frame in frames.items():
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, **options)
+            name = save_variant(buffer.getvalue(), width, extension)
+            names.append(name)
+            srcset.append(f'{default_storage.url(name)} {width}w')
+        sources.append({
+            'type': mime_type,
+            'srcset': ', '.join(srcset),
+            'sizes': VARIANT_SIZES,
+        })
+    return json.dumps(sources), names
+
+
+def render_images(post_id):
+    """Готовит миниатюру и варианты картинки и записывает их в пост."""
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author', 'group'
+    ).first()
+    if post is None or not post.image:
+        return None
+    url = get_thumbnail(
+        post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS
+    ).url
+    variants, names = render_variants(post.image)
+    # gc_media удалит варианты вместе с исходником.
+    MediaBlob.objects.filter(name=post.image.name).update(
+        derived=json.dumps(names)
+    )
+    # Пока картинка обрабатывалась, её могли заменить.
+    updated = Post.objects.filter(
+        pk=post_id, image=post.image.name
+    ).update(
+        thumbnail_url=url, image_variants=variants,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        purge(f'images {post_id}',
+              post_keys(post_id, post.author_id, {post.group_id}))
+    return url
+
+
+def render_in_worker(post_id):
+    try:
+        render_images(post_id)
+    except Exception:
+        logger.exception('Не удалось обработать картинку поста %s',
+                         post_id)
+    finally:
+        close_old_connections()
+
+
+def schedule(post_id):
+    """Ставит обработку картинки в очередь после коммита транзакции."""
+    if settings.THUMBNAIL_SYNC:
+        render_images(post_id)
+        return
+    transaction.on_commit(lambda: pool().submit(render_in_worker, post_id))
+
+
+def ensure_images(post):
+    """Ставит в очередь картинку без миниатюры, замеченную при показе.
+
+    Так посты, загруженные до появления миниатюр или потерявшие задачу
+    при перезапуске, получают её сами, без ручного generate_thumbnails.
+    """
+    if (post.image and not post.thumbnail_url
+            and cache.add(f'{QUEUED_KEY}{post.pk}', True, QUEUED_TIMEOUT)):
+        schedule(post.pk)
+
+
+@receiver(pre_save, sender=Post)
+def forget_stale_images(sender, instance, **kwargs):
+    if image_name(instance.image) != instance._loaded_image:
+        instance.thumbnail_url = ''
+        instance.image_variants = ''
+
+
+@receiver(post_save, sender=Post)
+def schedule_images(sender, instance, raw=False, **kwargs):
+    if not raw and instance.image and not instance.thumbnail_url:
+        schedule(instance.pk)
@@ -0,0 +1,142 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .feeds import group_feed, index_feed, profile_feed
+from .generations import generation_key
+from .models import Comment, Follow, Group, Post
+from .utils import FeedPaginator
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Поля пользователя, которые видны на страницах.
+SHOWN_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def count_key(posts):
+    return FeedPaginator(posts, 1).count_cache_key
+
+
+def author_keys(author_id, group_ids):
+    """Ключи и теги лент, где появляются посты автора из этих групп."""
+    tags = [('posts',), ('author', author_id)]
+    keys = [count_key(index_feed()), count_key(profile_feed(author_id))]
+    for group_id in group_ids:
+        if group_id:
+            tags.append(('group', group_id))
+            keys.append(count_key(group_feed(group_id)))
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )
+    tags.extend(('follow', user_id) for user_id in followers)
+    return keys + [generation_key(*tag) for tag in tags]
+
+
+def post_keys(post_id, author_id, group_ids):
+    """Ключи и теги, которые зависят от поста и его комментариев."""
+    return [generation_key('post', post_id)] + author_keys(
+        author_id, group_ids
+    )
+
+
+def posts_keys(rows, group_ids):
+    """То же для пачки (post_id, author_id): по запросу на автора."""
+    keys = [generation_key('post', post_id) for post_id, _ in rows]
+    for author_id in {author_id for _, author_id in rows}:
+        keys.extend(author_keys(author_id, group_ids))
+    return keys
+
+
+def purge(reason, keys):
+    """Сбрасывает ключи и теги одним обращением к кэшу."""
+    keys = list(dict.fromkeys(keys))
+    purged = cache.delete_many(keys)
+    logger.info(
+        'Сброшено ключей кэша: %s из %d (%s)',
+        purged if purged is not None else '?', len(keys), reason,
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_group(sender, instance, **kwargs):
+    instance._group_id_before_save = getattr(
+        instance, '_loaded_group_id', None
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post(sender, instance, **kwargs):
+    group_ids = {
+        instance.group_id,
+        getattr(instance, '_group_id_before_save', None),
+    }
+    purge(
+        f'post {instance.pk}',
+        post_keys(instance.pk, instance.author_id, group_ids),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment(sender, instance, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'author_id', 'group_id'
+    ).first()
+    if post is None:
+        return
+    purge(
+        f'comment {instance.pk}',
+        post_keys(instance.post_id, post['author_id'], {post['group_id']}),
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def purge_follow(sender, instance, **kwargs):
+    purge(
+        f'follow {instance.user_id}->{instance.author_id}',
+        [generation_key('follow', instance.user_id)],
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def purge_group(sender, instance, **kwargs):
+    purge(
+        f'group {instance.pk}',
+        [
+            generation_key('group', instance.pk),
+            generation_key('groups'),
+            count_key(group_feed(instance.pk)),
+        ],
+    )
+
+
+@receiver(post_save, sender=User)
+def purge_user(sender, instance, created, update_fields=None, **kwargs):
+    """Имя автора есть в лентах, профиле и под его комментариями.
+
+    Сохранение без видимых полей (last_login при входе) не сбрасывает
+    ничего.
+    """
+    if created or (update_fields
+                   and not SHOWN_USER_FIELDS & set(update_fields)):
+        return
+    group_ids = set(
+        Post.objects.filter(author=instance).order_by().values_list(
+            'group_id', flat=True
+        ).distinct()
+    )
+    commented = Comment.objects.filter(author=instance).order_by(
+    ).values_list('post_id', flat=True).distinct()
+    purge(
+        f'user {instance.pk}',
+        author_keys(instance.pk, group_ids)
+        + [generation_key('post', post_id) for post_id in commented],
+    )
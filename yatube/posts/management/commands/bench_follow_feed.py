@@ -0,0 +1,53 @@
+from timeit import default_timer
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.feeds import (FOLLOW_FEED_JOIN, FOLLOW_FEED_MERGE,
+                         FOLLOW_FEED_TIMELINE, follow_feed)
+from posts.models import Post
+from posts.utils import NUMBER_OF_POSTS
+
+User = get_user_model()
+
+ENGINES = (FOLLOW_FEED_JOIN, FOLLOW_FEED_TIMELINE, FOLLOW_FEED_MERGE)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает движки ленты подписок на текущей базе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--page', type=int, default=1)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, username, page, repeat, **options):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден.')
+        bottom = (page - 1) * NUMBER_OF_POSTS
+        top = bottom + NUMBER_OF_POSTS
+        # Эталон — простой запрос через Follow без оптимизаций движков.
+        reference = list(
+            Post.objects.filter(author__following__user=user).order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', flat=True)[bottom:top]
+        )
+        for engine in ENGINES:
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = default_timer()
+                    ids = [post.pk for post in
+                           follow_feed(user, engine)[bottom:top]]
+                    timings.append(default_timer() - started)
+            timings.sort()
+            self.stdout.write(
+                f'{engine:>8}: медиана {timings[len(timings) // 2] * 1000:.2f}'
+                f' мс, лучшее {timings[0] * 1000:.2f} мс,'
+                f' запросов {len(queries)}'
+                + ('' if ids == reference else ', РАСХОДИТСЯ с эталоном')
+            )
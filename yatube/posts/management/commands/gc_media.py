@@ -0,0 +1,101 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_thumbnails
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import MediaBlob, Post
+
+
+class Command(BaseCommand):
+    help = ('Удаляет файлы картинок, на которые не ссылается ни один пост, '
+            'вместе с их миниатюрами и вариантами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=3600,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--repair', action='store_true',
+            help='Сначала пересчитать ссылки по таблице постов.',
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, grace, repair, dry_run, **options):
+        if repair:
+            self.stdout.write(f'Исправлено счётчиков: {self.repair()}')
+        storage = Post._meta.get_field('image').storage
+        deadline = timezone.now() - timedelta(seconds=grace)
+        removed = 0
+        garbage = MediaBlob.objects.filter(refs=0, updated__lt=deadline)
+        for blob in garbage.iterator():
+            name = blob.name
+            # Файл могли только что загрузить заново под тем же хэшем.
+            if (storage.exists(name)
+                    and storage.get_modified_time(name) >= deadline):
+                continue
+            if not dry_run:
+                self.delete_derived(blob, storage)
+                if storage.exists(name):
+                    storage.delete(name)
+                MediaBlob.objects.filter(name=name, refs=0).delete()
+            removed += 1
+        self.stdout.write(f'Удалено файлов: {removed}')
+
+    def delete_derived(self, blob, storage):
+        # Миниатюры sorl помнит по исходнику в своём хранилище ключей.
+        delete_thumbnails(ImageFile(blob.name, storage), delete_file=False)
+        for name in blob.derived_names:
+            # Одинаковый вариант мог получиться и из другой картинки.
+            shared = MediaBlob.objects.exclude(name=blob.name).filter(
+                derived__contains=json.dumps(name)
+            ).exists()
+            if not shared and default_storage.exists(name):
+                default_storage.delete(name)
+
+    def repair(self):
+        actual = dict(
+            Post.objects.order_by().exclude(image='').exclude(
+                image__isnull=True
+            ).values('image').annotate(total=Count('pk')).values_list(
+                'image', 'total'
+            )
+        )
+        stored = dict(MediaBlob.objects.values_list('name', 'refs'))
+        broken = {
+            name: actual.get(name, 0)
+            for name in set(actual) | set(stored)
+            if actual.get(name, 0) != stored.get(name)
+        }
+        with transaction.atomic():
+            for name, refs in broken.items():
+                MediaBlob.objects.update_or_create(
+                    name=name, defaults={'refs': refs}
+                )
+            self.repair_derived()
+        return len(broken)
+
+    def repair_derived(self):
+        """Имена вариантов для файлов, обработанных до их учёта."""
+        unknown = MediaBlob.objects.filter(derived='', refs__gt=0)
+        variants = Post.objects.filter(
+            image__in=unknown.values('name')
+        ).exclude(image_variants='').values_list('image', 'image_variants')
+        derived = {}
+        for image, sources in variants.iterator():
+            derived[image] = [
+                candidate.split()[0][len(settings.MEDIA_URL):]
+                for source in json.loads(sources)
+                for candidate in source['srcset'].split(', ')
+            ]
+        for name, names in derived.items():
+            MediaBlob.objects.filter(name=name).update(
+                derived=json.dumps(names)
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts.images import render_images
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Готовит миниатюры и варианты картинок, которых ещё нет.'
+
+    def handle(self, *args, **options):
+        pending = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).filter(
+            Q(thumbnail_url='') | Q(image_variants='')
+        ).values_list('pk', flat=True)
+        done = sum(
+            render_images(post_id) is not None
+            for post_id in pending.iterator()
+        )
+        self.stdout.write(f'Обработано картинок: {done}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from posts.uploads import ingest_metrics, reset_ingest_metrics
+
+
+class Command(BaseCommand):
+    help = 'Показывает, сколько места сэкономила нормализация картинок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true')
+
+    def handle(self, reset, **options):
+        stats = ingest_metrics()
+        for metric, value in stats.items():
+            self.stdout.write(f'{metric}: {value}')
+        saved = stats['bytes_in'] - stats['bytes_out']
+        self.stdout.write(f'saved: {filesizeformat(saved)}')
+        if reset:
+            reset_ingest_metrics()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Follow, TimelineEntry
+from posts.timeline import backfill
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает материализованные ленты подписок.'
+
+    def handle(self, *args, **options):
+        follows = Follow.objects.values_list('user_id', 'author_id')
+        with transaction.atomic():
+            TimelineEntry.objects.all().delete()
+            for user_id, author_id in follows.iterator():
+                backfill(user_id, author_id)
+        self.stdout.write(
+            f'Записей в лентах: {TimelineEntry.objects.count()}'
+        )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from posts.models import Comment, Post, render_preview, render_text
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Заполняет готовый HTML и превью текстов постов и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='everything',
+            help='Пересобрать HTML всех текстов, а не только пустой.',
+        )
+
+    def handle(self, everything, **options):
+        for model in (Post, Comment):
+            queryset = model.objects.order_by('pk').only('pk', 'text')
+            if not everything:
+                empty = Q(text_html='')
+                if model is Post:
+                    empty |= Q(preview_html='')
+                queryset = queryset.filter(empty)
+            done = self.render(model, queryset)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {done}')
+
+    def render(self, model, queryset):
+        fields = ['text_html']
+        if model is Post:
+            # Новая версия поста сбрасывает его закэшированные карточки.
+            fields += ['preview_html', 'has_more', 'updated_at']
+        done = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                return done
+            now = timezone.now()
+            for instance in batch:
+                instance.text_html = render_text(instance.text)
+                if model is Post:
+                    instance.preview_html, instance.has_more = (
+                        render_preview(instance.text)
+                    )
+                    instance.updated_at = now
+            model.objects.bulk_update(batch, fields)
+            done += len(batch)
+            last_pk = batch[-1].pk
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from posts.models import AuthorStats, Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и комментариев.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = {
+                'posts': self.repair(
+                    Post.objects.order_by(), 'comments', 'comments_count'
+                ),
+                'groups': self.repair(
+                    Group.objects.order_by(), 'posts', 'posts_count'
+                ),
+                'authors': self.repair_authors(),
+            }
+        for name, count in fixed.items():
+            self.stdout.write(f'{name}: исправлено {count}')
+
+    def repair(self, queryset, relation, field):
+        broken = queryset.annotate(total=Count(relation)).filter(
+            ~Q(**{field: F('total')})
+        ).values_list('pk', 'total')
+        for pk, total in broken:
+            queryset.filter(pk=pk).update(**{field: total})
+        return len(broken)
+
+    def repair_authors(self):
+        actual = dict(
+            Post.objects.order_by().values('author').annotate(
+                total=Count('pk')
+            ).values_list('author', 'total')
+        )
+        stored = dict(
+            AuthorStats.objects.values_list('author', 'posts_count')
+        )
+        broken = {
+            author: actual.get(author, 0)
+            for author in set(actual) | set(stored)
+            if actual.get(author, 0) != stored.get(author)
+        }
+        for author, total in broken.items():
+            AuthorStats.objects.update_or_create(
+                author_id=author, defaults={'posts_count': total}
+            )
+        return len(broken)
@@ -0,0 +1,92 @@
+import heapq
+
+from django.conf import settings
+from django.db.models import Max, Min, Sum
+
+from .models import AuthorStats, FEED_DEFERRED_FIELDS, Post
+from .utils import keyset_rows
+
+
+class MergedFeed:
+    """Лента подписок без JOIN через Follow и без записи при публикации.
+
+    Для каждого автора по индексу (author, pub_date) читается несколько
+    следующих постов, потоки сливаются через кучу, и чтение
+    останавливается, как только набрана нужная страница.
+    """
+
+    ordered = True
+
+    def __init__(self, author_ids, batch_size=None):
+        self.author_ids = list(author_ids)
+        self.batch_size = batch_size or settings.MERGE_FEED_BATCH_SIZE
+
+    def count(self):
+        return AuthorStats.objects.filter(
+            author_id__in=self.author_ids
+        ).aggregate(total=Sum('posts_count'))['total'] or 0
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is not None or index.stop is None:
+                raise ValueError('Поддерживаются только срезы [start:stop].')
+            start = index.start or 0
+            return self.keyset_rows(None, True, index.stop)[start:]
+        return self[index:index + 1][0]
+
+    def keyset_rows(self, key, descending, limit):
+        if not self.author_ids or limit <= 0:
+            return []
+        sign = -1 if descending else 1
+
+        def priority(post):
+            return sign * post.pub_date.timestamp(), sign * post.pk
+
+        posts = Post.objects.filter(author_id__in=self.author_ids)
+        heads = keyset_rows(posts, key, descending).order_by().values(
+            'author'
+        ).annotate(head=Max('pub_date') if descending else Min('pub_date'))
+        # Пока посты автора не загружены, известна только дата его
+        # ближайшего поста; -inf ставит такого автора раньше загруженных
+        # с той же датой, чтобы порядок по id не нарушился.
+        heap = [
+            (sign * row['head'].timestamp(), float('-inf'), row['author'])
+            for row in heads
+        ]
+        heapq.heapify(heap)
+        buffers = {}
+        cursors = {}
+        exhausted = set()
+        rows = []
+        while heap and len(rows) < limit:
+            *_, author_id = heapq.heappop(heap)
+            buffer = buffers.get(author_id)
+            if not buffer:
+                if author_id in exhausted:
+                    continue
+                buffer = buffers[author_id] = self.pull(
+                    author_id, cursors.get(author_id, key), descending
+                )
+                if len(buffer) < self.batch_size:
+                    exhausted.add(author_id)
+                if buffer:
+                    heapq.heappush(heap, (*priority(buffer[0]), author_id))
+                continue
+            post = buffer.pop(0)
+            rows.append(post)
+            cursors[author_id] = (post.pub_date, post.pk)
+            if buffer or author_id not in exhausted:
+                # Следующий пост автора не раньше уже выданного, так что
+                # его ключ годится как оценка до подгрузки новой пачки.
+                upcoming = buffer[0] if buffer else post
+                heapq.heappush(heap, (*priority(upcoming), author_id))
+        return rows
+
+    def pull(self, author_id, key, descending):
+        posts = Post.objects.select_related('author', 'group').defer(
+            *FEED_DEFERRED_FIELDS
+        ).filter(author_id=author_id)
+        return list(keyset_rows(posts, key, descending)[:self.batch_size])
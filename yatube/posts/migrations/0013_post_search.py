@@ -0,0 +1,54 @@
+from django.db import migrations
+
+TRIGGERS = (
+    '''
+    CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts (rowid, text) VALUES (new.id, new.text);
+    END
+    ''',
+    '''
+    CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts (posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    ''',
+    '''
+    CREATE TRIGGER posts_post_fts_update AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_fts (rowid, text) VALUES (new.id, new.text);
+    END
+    ''',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [
+                '''
+                CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+                    text,
+                    content='posts_post',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                ''',
+                *TRIGGERS,
+                "INSERT INTO posts_post_fts (posts_post_fts) "
+                "VALUES ('rebuild')",
+            ],
+            [
+                'DROP TRIGGER IF EXISTS posts_post_fts_insert',
+                'DROP TRIGGER IF EXISTS posts_post_fts_delete',
+                'DROP TRIGGER IF EXISTS posts_post_fts_update',
+                'DROP TABLE IF EXISTS posts_post_fts',
+            ],
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:30
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+# POST_PREVIEW_CHARS на момент миграции.
+PREVIEW_CHARS = 500
+
+
+def render_text(text):
+    return linebreaksbr(text, autoescape=True)
+
+
+def render_preview(text):
+    if len(text) <= PREVIEW_CHARS:
+        return render_text(text), False
+    return render_text(Truncator(text).chars(PREVIEW_CHARS)), True
+
+
+def render_texts(apps, schema_editor):
+    """Готовый HTML и превью для уже написанных постов и комментариев."""
+    for name in ('Post', 'Comment'):
+        model = apps.get_model('posts', name)
+        fields = ['text_html']
+        if name == 'Post':
+            fields += ['preview_html', 'has_more']
+        queryset = model.objects.order_by('pk').only('pk', 'text')
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                break
+            for instance in batch:
+                instance.text_html = render_text(instance.text)
+                if name == 'Post':
+                    instance.preview_html, instance.has_more = (
+                        render_preview(instance.text)
+                    )
+            model.objects.bulk_update(batch, fields)
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_text_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='has_more',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Текст длиннее превью'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='preview_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Превью в HTML'),
+        ),
+        migrations.RunPython(render_texts, migrations.RunPython.noop),
+    ]
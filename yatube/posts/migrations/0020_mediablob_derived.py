@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='derived',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -1,9 +1,26 @@
+import json
+
 from django.db import models
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import F
 from django.db.models.constraints import UniqueConstraint
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save
+)
+from django.dispatch import receiver
+from django.template.defaultfilters import linebreaksbr
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
+# Ленты показывают только превью; полный текст нужен странице поста.
+FEED_DEFERRED_FIELDS = ('text', 'text_html')
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -11,6 +28,25 @@ class Post(models.Model):
         help_text='Напишите пост'
     )
 
+    # Текст, уже экранированный и с <br>: шаблоны выводят его как есть.
+    text_html = models.TextField(
+        'Текст в HTML',
+        blank=True,
+        editable=False,
+    )
+
+    preview_html = models.TextField(
+        'Превью в HTML',
+        blank=True,
+        editable=False,
+    )
+
+    has_more = models.BooleanField(
+        'Текст длиннее превью',
+        default=False,
+        editable=False,
+    )
+
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата публикации')
@@ -33,17 +69,64 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
     )  
 
+    thumbnail_url = models.CharField(
+        'Адрес миниатюры',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+
+    # JSON: [{"type": "image/webp", "srcset": "... 480w, ...", "sizes": ...}]
+    image_variants = models.TextField(
+        'Варианты картинки',
+        blank=True,
+        editable=False,
+    )
+
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    # Версия поста для кэша карточек; update() в обход save() должен
+    # обновлять её сам.
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
     class Meta:
         ordering = ('-pub_date',)
         default_related_name = 'post'
+        indexes = (
+            models.Index(fields=('pub_date',), name='post_pub_date'),
+            models.Index(
+                fields=('author', 'pub_date'), name='post_author_pub_date'
+            ),
+            models.Index(
+                fields=('group', 'pub_date'), name='post_group_pub_date'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def image_sources(self):
+        return json.loads(self.image_variants) if self.image_variants else []
+
+    @property
+    def body_html(self):
+        return stored_html(self)
+
+    @property
+    def preview(self):
+        # Заполняется при сохранении, старые посты — миграцией 0019.
+        return mark_safe(self.preview_html)
+
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
@@ -59,6 +142,11 @@ class Comment(models.Model):
         verbose_name='Текст комментария.',
         help_text='Напишите текст комментария'
     )
+    text_html = models.TextField(
+        'Текст в HTML',
+        blank=True,
+        editable=False,
+    )
     created = models.DateTimeField(
         'date_created',
         auto_now_add=True
@@ -66,10 +154,19 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created'), name='comment_post_created'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def body_html(self):
+        return stored_html(self)
+
 class Group(models.Model):
     title = models.CharField(
         max_length=200,
@@ -91,6 +188,12 @@ class Group(models.Model):
         help_text='Описание группы',
     )
 
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False,
+    )
+
     def __str__(self) -> str:
         return self.title
 
@@ -107,4 +210,194 @@ class Follow(models.Model):
     )
 
     class Meta:
-        UniqueConstraint(fields=['user', 'author'], name='unique_follower')
\ No newline at end of file
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'author'), name='unique_follower'
+            ),
+        )
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        indexes = (
+            models.Index(
+                fields=('user', 'pub_date', 'post'),
+                name='timeline_user_pub_date',
+            ),
+        )
+        constraints = (
+            UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_post'
+            ),
+        )
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+    )
+
+    @classmethod
+    def posts_count_for(cls, author):
+        return cls.objects.filter(author=author).values_list(
+            'posts_count', flat=True
+        ).first() or 0
+
+
+class MediaBlob(models.Model):
+    """Файл картинки в ContentAddressedStorage и число ссылок на него."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    refs = models.PositiveIntegerField('Количество ссылок', default=0)
+    updated = models.DateTimeField(auto_now=True)
+    # JSON: имена вариантов (posts/variants/…), сделанных из этого файла.
+    derived = models.TextField(blank=True)
+
+    @property
+    def derived_names(self):
+        return json.loads(self.derived) if self.derived else []
+
+
+def image_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def render_text(text):
+    """Готовый HTML текста: экранирование и переносы строк."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def render_preview(text):
+    """HTML начала текста для лент и признак, что текст длиннее."""
+    limit = settings.POST_PREVIEW_CHARS
+    if len(text) <= limit:
+        return render_text(text), False
+    return render_text(Truncator(text).chars(limit)), True
+
+
+def stored_html(instance):
+    """Сохранённый HTML; пока render_texts не прошёл по старым записям,
+    текст рендерится на лету."""
+    if instance.text_html:
+        return mark_safe(instance.text_html)
+    return render_text(instance.text)
+
+
+def shift_counter(queryset, field, delta):
+    """Атомарно сдвигает счётчик, не опуская его ниже нуля."""
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def shift_author_posts(author_id, delta):
+    if delta > 0:
+        AuthorStats.objects.get_or_create(author_id=author_id)
+    shift_counter(
+        AuthorStats.objects.filter(author_id=author_id), 'posts_count', delta
+    )
+
+
+def shift_group_posts(group_id, delta):
+    if group_id is not None:
+        shift_counter(
+            Group.objects.filter(pk=group_id), 'posts_count', delta
+        )
+
+
+def shift_blob_refs(name, delta):
+    if not name:
+        return
+    blobs = MediaBlob.objects.filter(name=name)
+    if delta > 0:
+        MediaBlob.objects.get_or_create(name=name)
+    else:
+        # update() не трогает auto_now, а от этого времени отсчитывает
+        # отсрочку gc_media.
+        blobs.update(updated=timezone.now())
+    shift_counter(blobs, 'refs', delta)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_text_html(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance.text_html = render_text(instance.text)
+    if sender is Post:
+        instance.preview_html, instance.has_more = render_preview(
+            instance.text
+        )
+
+
+@receiver(post_init, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+    instance._loaded_image = image_name(instance.__dict__.get('image'))
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    image = image_name(instance.image)
+    if created:
+        shift_author_posts(instance.author_id, 1)
+        shift_group_posts(instance.group_id, 1)
+        shift_blob_refs(image, 1)
+    else:
+        if instance.group_id != instance._loaded_group_id:
+            shift_group_posts(instance._loaded_group_id, -1)
+            shift_group_posts(instance.group_id, 1)
+        if image != instance._loaded_image:
+            shift_blob_refs(instance._loaded_image, -1)
+            shift_blob_refs(image, 1)
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = image
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    shift_author_posts(instance.author_id, -1)
+    shift_group_posts(instance._loaded_group_id, -1)
+    shift_blob_refs(instance._loaded_image, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shift_counter(
+            Post.objects.filter(pk=instance.post_id), 'comments_count', 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    shift_counter(
+        Post.objects.filter(pk=instance.post_id), 'comments_count', -1
+    )
@@ -0,0 +1,149 @@
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+
+from .feeds import feed_queryset
+from .models import Post
+
+FTS_TABLE: str = 'posts_post_fts'
+
+# Больше слов в запросе не даёт лучшей выдачи, а поиск замедляет.
+MAX_TERMS: int = 8
+
+TOKEN = re.compile(r'\w+')
+
+# Триггеры живут на posts_post и пропадают, когда миграция на SQLite
+# пересоздаёт таблицу, поэтому после migrate они ставятся заново.
+TRIGGERS = {
+    f'{FTS_TABLE}_insert': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text);
+        END
+    ''',
+    f'{FTS_TABLE}_delete': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END
+    ''',
+    f'{FTS_TABLE}_update': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF text ON posts_post BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text);
+        END
+    ''',
+}
+
+
+def restore_triggers(sender, using, **kwargs):
+    """post_migrate: возвращает триггеры и переиндексирует посты."""
+    if connections[using].vendor != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+            " AND name LIKE %s",
+            (FTS_TABLE + '%',),
+        )
+        existing = {name for name, in cursor.fetchall()}
+        if FTS_TABLE not in existing or set(TRIGGERS) <= existing:
+            return
+        for sql in TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def match_expression(query):
+    """Запрос пользователя в безопасный MATCH: все слова, последнее —
+    как префикс. Операторы FTS5 из ввода не проходят."""
+    terms = TOKEN.findall(query.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def matching_ids(match):
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match,),
+    )
+
+
+def filter_posts(posts, query):
+    """Сужает выборку до постов, подходящих под запрос, по индексу FTS."""
+    match = match_expression(query)
+    if match is None:
+        return posts.none()
+    return posts.filter(pk__in=matching_ids(match))
+
+
+class SearchResults:
+    """Посты по релевантности (bm25) для пагинатора.
+
+    Страница rowid берётся из индекса FTS без JOIN, так что FTS5 сам
+    отбирает лучшие совпадения; посты подтягиваются вторым запросом.
+    Считаются и листаются только первые SEARCH_MAX_RESULTS совпадений.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+        self._count = None
+
+    def _cursor(self):
+        return connections[router.db_for_read(Post)].cursor()
+
+    def matches(self):
+        """Число совпадений, но не больше SEARCH_MAX_RESULTS + 1: лишнее
+        совпадение только говорит, что до конца не досчитали."""
+        if self.match is None:
+            return 0
+        if self._count is None:
+            with self._cursor() as cursor:
+                cursor.execute(
+                    f'SELECT COUNT(*) FROM (SELECT rowid FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s LIMIT %s)',
+                    (self.match, settings.SEARCH_MAX_RESULTS + 1),
+                )
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def count(self):
+        return min(self.matches(), settings.SEARCH_MAX_RESULTS)
+
+    @property
+    def truncated(self):
+        """Совпадений больше, чем считается."""
+        return self.matches() > settings.SEARCH_MAX_RESULTS
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is not None or index.stop is None:
+                raise ValueError('Поддерживаются только срезы [start:stop].')
+            start = index.start or 0
+            return self.page(start, index.stop - start)
+        return self[index:index + 1][0]
+
+    def page(self, offset, limit):
+        limit = min(limit, settings.SEARCH_MAX_RESULTS - offset)
+        if self.match is None or limit <= 0:
+            return []
+        with self._cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                (self.match, limit, offset),
+            )
+            ids = [pk for pk, in cursor.fetchall()]
+        posts = feed_queryset().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def content_hash(content):
+    """sha256 содержимого; загрузчик уже посчитал его на лету."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы по хэшу содержимого: posts/ab/abcd….gif.
+
+    Одинаковая картинка хранится один раз, сколько бы постов на неё ни
+    ссылалось, и миниатюры sorl, которые считаются по имени исходника,
+    тоже общие. Ссылки считает MediaBlob, удаляет файлы команда gc_media.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя всё равно определяется содержимым в _save.
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        digest = content_hash(content)
+        name = os.path.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            # Свежая отметка времени защищает файл от сборщика, пока
+            # новый пост с ним ещё не сохранён.
+            os.utime(self.path(name))
+            return name
+        # Файл пишется под временным именем и появляется под настоящим
+        # целиком. Одновременная загрузка того же содержимого проигрывает
+        # на link() и берёт уже готовый файл.
+        temporary = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        try:
+            os.link(self.path(temporary), self.path(name))
+        except FileExistsError:
+            os.utime(self.path(name))
+        finally:
+            os.remove(self.path(temporary))
+        return name
@@ -0,0 +1,59 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from ..generations import render_version
+from ..images import ensure_images
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/article.html'
+CARD_KEY = 'post_card:'
+
+
+def card_key(post, group):
+    """Ключ карточки: версия разметки, версия поста, число комментариев
+    и всё, что карточка показывает не из самого поста (автор, группа)."""
+    shown = '|'.join(str(part) for part in (
+        post.author.username,
+        post.author.get_full_name(),
+        post.group.slug if post.group_id else '',
+        post.group.title if post.group_id else '',
+        group is not None,
+    ))
+    digest = hashlib.md5(shown.encode()).hexdigest()
+    return (f'{CARD_KEY}{render_version()}:{post.pk}:'
+            f'{post.updated_at.timestamp()}:{post.comments_count}:{digest}')
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Пары (пост, HTML карточки) для страницы ленты.
+
+    Готовые карточки достаются из кэша одним запросом, рендерятся и
+    кладутся в кэш только новые или изменившиеся посты.
+    """
+    group = context.get('group')
+    posts = list(posts)
+    keys = [card_key(post, group) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    card_template = get_template(CARD_TEMPLATE)
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            missing[key] = card_template.render({'post': post, 'group': group})
+    if missing:
+        cache.set_many(missing, settings.FEED_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [(post, mark_safe(cards[key])) for post, key in zip(posts, keys)]
+
+
+@register.simple_tag
+def queue_missing_images(post):
+    """Запускает обработку картинки, если миниатюры ещё нет."""
+    ensure_images(post)
+    return ''
@@ -0,0 +1,160 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from ..generations import get_generation
+from ..models import Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.author = User.objects.create_user(username='auth')
+        cls.source = Group.objects.create(
+            title='Источник', slug='source', description='Описание'
+        )
+        cls.target = Group.objects.create(
+            title='Цель', slug='target', description='Описание'
+        )
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def add_posts(self, count, group=None):
+        return [
+            Post.objects.create(
+                text=f'Тестовый пост {i}', author=self.author, group=group
+            )
+            for i in range(count)
+        ]
+
+    def count_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        """Число запросов списка постов не растёт вместе с числом строк."""
+        self.add_posts(1, self.source)
+        queries = self.count_queries()
+        self.add_posts(20, self.target)
+        self.assertEqual(self.count_queries(), queries)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(
+            response, f'<option value="{self.target.pk}" selected>Цель',
+            count=20,
+        )
+
+    def test_move_to_group_keeps_counters(self):
+        """Массовый перенос поправляет счётчики групп и сбрасывает кэш."""
+        posts = self.add_posts(3, self.source)
+        generation = get_generation('group', self.target.pk)
+        self.client.post(self.url, {
+            'action': 'move_to_group',
+            'group': self.target.pk,
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts[:2]],
+        })
+        self.assertEqual(
+            Post.objects.filter(group=self.target).count(), 2
+        )
+        self.source.refresh_from_db()
+        self.target.refresh_from_db()
+        self.assertEqual(self.source.posts_count, 1)
+        self.assertEqual(self.target.posts_count, 2)
+        self.assertNotEqual(
+            get_generation('group', self.target.pk), generation
+        )
+
+    def test_move_out_of_groups(self):
+        """Пустая группа в действии убирает посты из групп."""
+        posts = self.add_posts(2, self.source)
+        self.client.post(self.url, {
+            'action': 'move_to_group',
+            'group': '',
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts],
+        })
+        self.source.refresh_from_db()
+        self.assertEqual(self.source.posts_count, 0)
+        self.assertFalse(Post.objects.filter(group__isnull=False))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_IMAGE_MAX_SIDE=64)
+class PostAdminUploadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.url = reverse('admin:posts_post_add')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def add_post(self, name, content):
+        return self.client.post(self.url, {
+            'text': 'Пост из админки',
+            'author': self.admin.pk,
+            'image': SimpleUploadedFile(name, content),
+        })
+
+    def test_image_normalized(self):
+        """Картинка из админки проходит ту же нормализацию, что и с сайта."""
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 100), 'red').save(buffer, 'JPEG')
+        response = self.add_post('photo.JPG', buffer.getvalue())
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        self.assertEqual(
+            (post.image.width, post.image.height), (64, 21)
+        )
+
+    @override_settings(POST_IMAGE_MAX_BYTES=20)
+    def test_upload_limit_applies(self):
+        """Админка отклоняет файл, который отверг обработчик загрузки."""
+        response = self.add_post('small.gif', SMALL_GIF)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'Файл больше',
+            response.context['adminform'].form.errors['image'][0],
+        )
+        self.assertFalse(Post.objects.exists())
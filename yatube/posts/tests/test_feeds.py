@@ -0,0 +1,228 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..feeds import (FOLLOW_FEED_JOIN, FOLLOW_FEED_MERGE,
+                     FOLLOW_FEED_TIMELINE, follow_feed)
+from ..models import Comment, Follow, Group, Post, TimelineEntry
+from ..utils import NUMBER_OF_POSTS
+
+User = get_user_model()
+
+FEED_QUERY_BUDGET = 10
+
+
+class FeedQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Описание',
+            slug='test-slug',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.author}),
+            reverse('posts:follow_index'),
+        )
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def add_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}', author=self.author, group=self.group
+            )
+            Comment.objects.create(
+                post=post, author=self.reader, text='Комментарий'
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.reader_client.get(url)
+        return len(context)
+
+    def test_feed_queries_do_not_depend_on_page_size(self):
+        """Число запросов ленты не зависит от числа постов на странице."""
+        self.add_posts(1)
+        small = {url: self.count_queries(url) for url in self.urls}
+        self.add_posts(NUMBER_OF_POSTS)
+        for url in self.urls:
+            with self.subTest(url=url):
+                queries = self.count_queries(url)
+                self.assertEqual(queries, small[url])
+                self.assertLessEqual(queries, FEED_QUERY_BUDGET)
+
+    def test_feeds_do_not_load_full_text(self):
+        """Ленты читают превью, а полный текст постов не загружают."""
+        self.add_posts(2)
+        urls = self.urls + (reverse('posts:search') + '?q=Тестовый',)
+        for engine in (FOLLOW_FEED_JOIN, FOLLOW_FEED_TIMELINE,
+                       FOLLOW_FEED_MERGE):
+            for url in urls:
+                cache.clear()
+                with self.subTest(engine=engine, url=url), \
+                        override_settings(FOLLOW_FEED_ENGINE=engine), \
+                        CaptureQueriesContext(connection) as context:
+                    self.assertContains(
+                        self.reader_client.get(url), 'Тестовый пост'
+                    )
+                    for query in context.captured_queries:
+                        self.assertNotIn('"posts_post"."text"', query['sql'])
+
+
+@override_settings(POST_PREVIEW_CHARS=20)
+class PostPreviewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_long_post_preview(self):
+        """В ленте начало длинного поста, целиком он на своей странице."""
+        post = Post.objects.create(
+            text='Начало длинного поста и его продолжение', author=self.author
+        )
+        self.assertTrue(post.has_more)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Начало длинного')
+        self.assertNotContains(response, 'продолжение')
+        self.assertContains(response, 'Читать дальше')
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, 'продолжение')
+
+    def test_short_post_whole(self):
+        """Короткий пост показывается целиком, без ссылки «дальше»."""
+        post = Post.objects.create(text='Короткий пост', author=self.author)
+        self.assertFalse(post.has_more)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Короткий пост')
+        self.assertNotContains(response, 'Читать дальше')
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        for i in range(5):
+            Post.objects.create(text=f'Старый пост {i}', author=cls.author)
+
+    def feed_ids(self, engine):
+        return [post.id for post in follow_feed(self.reader, engine)]
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        """Подписка заполняет ленту, отписка очищает её."""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 5
+        )
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+
+    def test_timeline_matches_join(self):
+        """Материализованная лента совпадает с запросом через Follow."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(
+            self.feed_ids(FOLLOW_FEED_TIMELINE),
+            self.feed_ids(FOLLOW_FEED_JOIN),
+        )
+
+    @override_settings(TIMELINE_MAX_ENTRIES=3)
+    def test_timeline_is_capped(self):
+        """В ленте хранится не больше TIMELINE_MAX_ENTRIES записей."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        new_post = Post.objects.create(text='Новый пост', author=self.author)
+        entries = TimelineEntry.objects.filter(user=self.reader)
+        self.assertEqual(entries.count(), 3)
+        self.assertEqual(entries.first().post, new_post)
+
+    @override_settings(TIMELINE_MAX_ENTRIES=3)
+    def test_fan_out_queries_do_not_depend_on_followers(self):
+        """Рассылка и обрезка лент не делают запросов на подписчика."""
+        def publish():
+            with CaptureQueriesContext(connection) as context:
+                Post.objects.create(text='Новый пост', author=self.author)
+            return len(context)
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        queries = publish()
+        for i in range(5):
+            Follow.objects.create(
+                user=User.objects.create_user(username=f'follower{i}'),
+                author=self.author,
+            )
+        self.assertEqual(publish(), queries)
+        for user_id in Follow.objects.values_list('user_id', flat=True):
+            self.assertEqual(
+                TimelineEntry.objects.filter(user_id=user_id).count(), 3
+            )
+
+
+class MergedFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(4)
+        ]
+        for i in range(NUMBER_OF_POSTS * 2):
+            Post.objects.create(
+                text=f'Тестовый пост {i}', author=authors[i * i % 3]
+            )
+        for author in authors:
+            Follow.objects.create(user=cls.reader, author=author)
+        cls.expected = [
+            post.id for post in follow_feed(cls.reader, FOLLOW_FEED_JOIN)
+        ]
+
+    def test_merge_matches_join(self):
+        """Слияние по авторам совпадает с лентой через JOIN."""
+        feed = follow_feed(self.reader, FOLLOW_FEED_MERGE)
+        self.assertEqual(feed.count(), len(self.expected))
+        for bottom in (0, 5, NUMBER_OF_POSTS):
+            with self.subTest(bottom=bottom):
+                top = bottom + NUMBER_OF_POSTS
+                self.assertEqual(
+                    [post.id for post in feed[bottom:top]],
+                    self.expected[bottom:top],
+                )
+
+    @override_settings(FOLLOW_FEED_ENGINE=FOLLOW_FEED_MERGE,
+                       POSTS_PAGINATION='cursor')
+    def test_merge_cursor_pages(self):
+        """Движок слияния работает с курсорной пагинацией."""
+        client = Client()
+        client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        cache.clear()
+        first = client.get(url).context['page_obj']
+        second = client.get(url, {'after': first.next_cursor})
+        back = client.get(
+            url, {'before': second.context['page_obj'].previous_cursor}
+        )
+        self.assertEqual(
+            [post.id for post in second.context['page_obj']],
+            self.expected[NUMBER_OF_POSTS:NUMBER_OF_POSTS * 2],
+        )
+        self.assertEqual(
+            [post.id for post in back.context['page_obj']],
+            [post.id for post in first],
+        )
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 from http import HTTPStatus
@@ -11,6 +12,13 @@ from django.urls import reverse
 from ..models import Comment, Group, Post
 
 User = get_user_model()
+
+
+def stored_name(content, extension='.gif'):
+    digest = hashlib.sha256(content).hexdigest()
+    return f'posts/{digest[:2]}/{digest}{extension}'
+
+
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
@@ -27,6 +35,7 @@ class PostCreateFormTests(TestCase):
             b'\x02\x00\x01\x00\x00\x02\x02\x0C'
             b'\x0A\x00\x3B'
         )
+        cls.stored_old = stored_name(small_gif)
         cls.uploaded = SimpleUploadedFile(
             name='small_old.gif',
             content=small_gif,
@@ -40,6 +49,7 @@ class PostCreateFormTests(TestCase):
             b'\x00\x00\x01\x00\x01\x00\x00\x02'
             b'\x02\x4c\x01\x00\x3b'
         )
+        cls.stored_new = stored_name(small_gif_new)
         cls.uploaded_new = SimpleUploadedFile(
             name='small_new.gif',
             content=small_gif_new,
@@ -73,6 +83,7 @@ class PostCreateFormTests(TestCase):
     def test_correct_create_post(self):
         """Проверка создания нового поста авторизованным пользователем."""
         count_posts = Post.objects.count()
+        self.uploaded.seek(0)
         form_data = {
             'text': 'Тестовый пост',
             'group': self.group.id,
@@ -91,7 +102,7 @@ class PostCreateFormTests(TestCase):
             Post.objects.filter(
                 group=self.group.id,
                 text='Тестовый пост',
-                image='posts/small_old.gif',
+                image=self.stored_old,
             ).exists()
         )
 
@@ -126,7 +137,7 @@ class PostCreateFormTests(TestCase):
         changed_post = Post.objects.get(id=self.group.id)
         self.assertEqual(response_edit.status_code, HTTPStatus.OK)
         self.assertEqual(changed_post.text, 'Новый текст')
-        self.assertEqual(changed_post.image, 'posts/small_new.gif')
+        self.assertEqual(changed_post.image, self.stored_new)
 
     def test_guest_create_post(self):
         """Проверка создания нового поста гостем."""
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings, TestCase
+from django.urls import reverse
+
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+OTHER_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+def uploaded(name, content=SMALL_GIF):
+    return SimpleUploadedFile(
+        name=name, content=content, content_type='image/gif'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def create_post(self, name):
+        self.authorized_client.post(
+            reverse('posts:create_post'),
+            {'text': 'Пост с картинкой', 'image': uploaded(name)},
+        )
+        return Post.objects.latest('pk')
+
+    @override_settings(THUMBNAIL_SYNC=True)
+    def test_thumbnail_rendered_on_save(self):
+        """Миниатюра готовится при сохранении, шаблон берёт её адрес."""
+        post = self.create_post('first.gif')
+        self.assertTrue(post.thumbnail_url)
+        path = post.thumbnail_url[len(settings.MEDIA_URL):]
+        self.assertTrue(
+            os.path.exists(os.path.join(TEMP_MEDIA_ROOT, path))
+        )
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, post.thumbnail_url)
+
+    @override_settings(THUMBNAIL_SYNC=True)
+    def test_variants_in_srcset(self):
+        """Варианты картинки с хэшем в имени попадают в srcset."""
+        post = self.create_post('variants.gif')
+        sources = post.image_sources
+        self.assertIn('image/webp', [source['type'] for source in sources])
+        for source in sources:
+            for candidate in source['srcset'].split(', '):
+                url, width = candidate.split()
+                self.assertRegex(url, r'/posts/variants/[0-9a-f]{16}-\d+\.')
+                self.assertTrue(os.path.exists(os.path.join(
+                    TEMP_MEDIA_ROOT, url[len(settings.MEDIA_URL):]
+                )))
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, f'srcset="{sources[0]["srcset"]}"')
+
+    @override_settings(THUMBNAIL_SYNC=True)
+    def test_new_image_gets_new_thumbnail(self):
+        """Замена картинки заменяет и миниатюру."""
+        post = self.create_post('old.gif')
+        old_url = post.thumbnail_url
+        post.image = uploaded('new.gif', OTHER_GIF)
+        post.save()
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
+        self.assertNotEqual(post.thumbnail_url, old_url)
+        self.assertTrue(post.image_sources)
+
+    def test_pending_thumbnail_falls_back_to_image(self):
+        """Пока миниатюры нет, лента показывает оригинал."""
+        post = self.create_post('pending.gif')
+        self.assertEqual(post.thumbnail_url, '')
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, post.image.url)
+
+    def test_missing_thumbnail_queued_when_shown(self):
+        """Картинка без миниатюры ставится в очередь при первом показе."""
+        cache.clear()
+        post = self.create_post('old.gif')
+        self.assertEqual(post.thumbnail_url, '')
+        with override_settings(THUMBNAIL_SYNC=True):
+            self.authorized_client.get(reverse('posts:index'))
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnail_url)
+        self.assertTrue(post.image_sources)
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings, TestCase
+
+from ..generations import generation_key, get_generations
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class InvalidationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Описание',
+            slug='test-slug'
+        )
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertPurged(self, scopes, action):
+        before = get_generations(*scopes)
+        with self.assertLogs('posts.invalidation', 'INFO'):
+            action()
+        after = get_generations(*scopes)
+        for scope, old, new in zip(scopes, before, after):
+            with self.subTest(scope=scope):
+                self.assertNotEqual(old, new)
+
+    def test_comment_purges_dependent_pages(self):
+        """Комментарий сбрасывает главную, группу, профиль, пост и ленты."""
+        self.assertPurged(
+            (
+                ('posts',),
+                ('post', self.post.pk),
+                ('author', self.author.pk),
+                ('group', self.group.pk),
+                ('follow', self.follower.pk),
+            ),
+            lambda: Comment.objects.create(
+                post=self.post, author=self.stranger, text='Комментарий'
+            ),
+        )
+
+    def test_rename_purges_author_pages(self):
+        """Новое имя автора сбрасывает страницы, где оно показано."""
+        Comment.objects.create(
+            post=Post.objects.create(author=self.stranger, text='Чужой'),
+            author=self.author, text='Комментарий',
+        )
+        commented = Post.objects.get(author=self.stranger).pk
+
+        def rename():
+            self.author.first_name = 'Новое имя'
+            self.author.save()
+
+        self.assertPurged(
+            (
+                ('posts',),
+                ('author', self.author.pk),
+                ('group', self.group.pk),
+                ('follow', self.follower.pk),
+                ('post', commented),
+            ),
+            rename,
+        )
+
+    def test_login_keeps_pages(self):
+        """Вход пользователя ничего не сбрасывает."""
+        before = get_generations(('author', self.author.pk))
+        self.client.force_login(self.author)
+        self.author.save(update_fields=['last_login'])
+        self.assertEqual(get_generations(('author', self.author.pk)), before)
+
+    def test_render_version_in_keys(self):
+        """Новая версия разметки даёт новые ключи поколений."""
+        with override_settings(RENDER_VERSION='1'):
+            first = generation_key('posts')
+        with override_settings(RENDER_VERSION='2'):
+            self.assertNotEqual(generation_key('posts'), first)
+
+    def test_unrelated_feeds_are_kept(self):
+        """Пост не сбрасывает ленту тех, кто не подписан на автора."""
+        before = get_generations(('follow', self.stranger.pk))
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(get_generations(('follow', self.stranger.pk)), before)
+
+    def test_group_change_purges_group_tags(self):
+        """Изменение группы сбрасывает её страницу и подписи групп."""
+        self.group.title = 'Новый заголовок'
+        self.assertPurged(
+            (('group', self.group.pk), ('groups',)), self.group.save
+        )
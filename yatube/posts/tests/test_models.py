@@ -1,7 +1,10 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import AuthorStats, Comment, Group, Post
 
 User = get_user_model()
 
@@ -83,3 +86,99 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     group._meta.get_field(field).help_text, expected_value)
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+
+    def refresh(self):
+        for obj in (self.group, self.other_group):
+            obj.refresh_from_db()
+        return AuthorStats.posts_count_for(self.user)
+
+    def test_post_counters(self):
+        """Счётчики постов автора и группы следуют за постами."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый текст', group=self.group
+        )
+        self.assertEqual(self.refresh(), 1)
+        self.assertEqual(self.group.posts_count, 1)
+
+        post.group = self.other_group
+        post.save()
+        self.refresh()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+
+        post.delete()
+        self.assertEqual(self.refresh(), 0)
+        self.assertEqual(self.other_group.posts_count, 0)
+
+    def test_comment_counter(self):
+        """Счётчик комментариев поста следует за комментариями."""
+        post = Post.objects.create(author=self.user, text='Тестовый текст')
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Комментарий'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_repair_counters(self):
+        """Команда repair_counters чинит рассинхронизированные счётчики."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Тестовый текст', group=self.group)
+            for _ in range(3)
+        ])
+        call_command('repair_counters', stdout=StringIO())
+        self.assertEqual(self.refresh(), 3)
+        self.assertEqual(self.group.posts_count, 3)
+
+
+class TextHtmlTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_html_rendered_on_save(self):
+        """При сохранении текст экранируется и получает переносы строк."""
+        post = Post.objects.create(
+            author=self.user, text='<b>Жирный</b>\nвторая строка'
+        )
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='1 < 2\n3'
+        )
+        self.assertEqual(
+            post.text_html,
+            '&lt;b&gt;Жирный&lt;/b&gt;<br>вторая строка',
+        )
+        self.assertEqual(comment.text_html, '1 &lt; 2<br>3')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(Post.objects.get().text_html, 'Новый текст')
+
+    def test_render_texts_backfills(self):
+        """Команда render_texts заполняет HTML старых записей."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Старый\nпост')
+        ])
+        self.assertEqual(Post.objects.get().text_html, '')
+        self.assertEqual(Post.objects.get().body_html, 'Старый<br>пост')
+        call_command('render_texts', stdout=StringIO())
+        self.assertEqual(Post.objects.get().text_html, 'Старый<br>пост')
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+from ..templatetags.post_cards import card_key
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def fresh_post(self):
+        return Post.objects.select_related('author', 'group').get(
+            pk=self.post.pk
+        )
+
+    def test_cached_card_reused(self):
+        """Неизменившийся пост не рендерится заново."""
+        self.client.get(self.profile_url)
+        key = card_key(self.fresh_post(), None)
+        self.assertIn('Тестовый пост', cache.get(key))
+        cache.set(key, 'Карточка из кэша')
+        self.assertContains(self.client.get(self.profile_url),
+                            'Карточка из кэша')
+
+    def test_render_version_renders_new_card(self):
+        """С новой версией разметки карточка рендерится заново."""
+        self.client.get(self.profile_url)
+        cache.set(card_key(self.fresh_post(), None), 'Карточка из кэша')
+        with override_settings(RENDER_VERSION='next'):
+            response = self.client.get(self.profile_url)
+        self.assertNotContains(response, 'Карточка из кэша')
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_edit_renders_new_card(self):
+        """Правка поста меняет версию, и карточка рендерится заново."""
+        self.client.get(self.profile_url)
+        post = self.fresh_post()
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertContains(self.client.get(self.profile_url),
+                            'Исправленный пост')
+
+    def test_comment_renders_new_card(self):
+        """Новый комментарий виден в карточке."""
+        self.client.get(self.profile_url)
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        self.assertContains(self.client.get(self.profile_url),
+                            'Комментариев: 1')
+
+    def test_group_page_has_own_card(self):
+        """На странице группы карточка без ссылки на эту же группу."""
+        group_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.assertContains(self.client.get(self.profile_url), group_url)
+        response = self.client.get(group_url)
+        self.assertContains(response, 'Тестовый пост')
+        self.assertNotContains(response, f'href="{group_url}"')
@@ -0,0 +1,103 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..feeds import FOLLOW_FEED_MERGE, FOLLOW_FEED_TIMELINE
+from ..models import Comment, Follow, Group, Post
+from ..utils import NUMBER_OF_POSTS, PAGINATION_CURSOR, PAGINATION_PAGE
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\S+( AS \S+)?$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTest(TestCase):
+    """Запросы лент не читают таблицы целиком и не сортируют во временном
+    B-дереве: на каждый выполненный SELECT снимается EXPLAIN QUERY PLAN.
+
+    Лента подписок через JOIN (FOLLOW_FEED_JOIN) не проверяется: она
+    сливает посты нескольких авторов и без сортировки не обходится.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Описание',
+            slug='test-slug',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(NUMBER_OF_POSTS + 1):
+            cls.post = Post.objects.create(
+                text=f'Тестовый пост {i}', author=cls.author, group=cls.group
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_plans(self, url, data=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.reader_client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            for detail in self.explain(sql):
+                with self.subTest(url=url, sql=sql, detail=detail):
+                    self.assertIsNone(FULL_SCAN.match(detail))
+                    self.assertNotIn(TEMP_SORT, detail)
+        return response
+
+    def feed_urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:follow_index'),
+        )
+
+    def test_page_pagination_plans(self):
+        """Страницы лент с номерами идут по индексам."""
+        for engine in (FOLLOW_FEED_TIMELINE, FOLLOW_FEED_MERGE):
+            with override_settings(FOLLOW_FEED_ENGINE=engine,
+                                   POSTS_PAGINATION=PAGINATION_PAGE):
+                for url in self.feed_urls():
+                    self.assert_plans(url, {'page': 2})
+
+    def test_cursor_pagination_plans(self):
+        """Курсорные страницы в обе стороны идут по индексам."""
+        for engine in (FOLLOW_FEED_TIMELINE, FOLLOW_FEED_MERGE):
+            with override_settings(FOLLOW_FEED_ENGINE=engine,
+                                   POSTS_PAGINATION=PAGINATION_CURSOR):
+                for url in self.feed_urls():
+                    page = self.assert_plans(url).context['page_obj']
+                    second = self.assert_plans(
+                        url, {'after': page.next_cursor}
+                    ).context['page_obj']
+                    self.assert_plans(
+                        url, {'before': second.previous_cursor}
+                    )
+
+    def test_post_detail_plans(self):
+        """Страница поста с комментариями идёт по индексам."""
+        self.assert_plans(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import FTS_TABLE, restore_triggers, SearchResults
+from ..utils import NUMBER_OF_POSTS
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='auth')
+        cls.short = Post.objects.create(
+            text='Кошки', author=cls.author
+        )
+        cls.long = Post.objects.create(
+            text='Длинный рассказ про собак, в конце упомянуты кошки',
+            author=cls.author,
+        )
+        Post.objects.create(text='Про погоду', author=cls.author)
+
+    def ids(self, query):
+        results = SearchResults(query)
+        return [post.pk for post in results[:results.count()]]
+
+    def test_ranked_case_insensitive_prefix(self):
+        """Поиск без учёта регистра, по префиксу и по релевантности."""
+        self.assertEqual(self.ids('КОШКИ'), [self.short.pk, self.long.pk])
+        self.assertEqual(self.ids('соба'), [self.long.pk])
+        self.assertEqual(self.ids('кошки погода'), [])
+
+    def test_index_follows_edits(self):
+        """Правка и удаление поста сразу видны в поиске."""
+        short = Post.objects.get(pk=self.short.pk)
+        short.text = 'Про котов'
+        short.save()
+        self.assertEqual(self.ids('кошки'), [self.long.pk])
+        self.assertEqual(self.ids('котов'), [short.pk])
+        Post.objects.filter(pk=self.long.pk).delete()
+        self.assertEqual(self.ids('кошки'), [])
+
+    def test_fts_syntax_in_query_is_ignored(self):
+        """Операторы FTS5 во вводе не ломают запрос."""
+        for query in ('"кошки', 'NEAR(кошки', 'кошки OR *', '', '***'):
+            with self.subTest(query=query):
+                self.ids(query)
+
+    def test_triggers_restored_after_migrate(self):
+        """post_migrate возвращает триггеры, потерянные при миграции."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_insert')
+        post = Post.objects.create(text='Новые кошки', author=self.author)
+        restore_triggers(None, connection.alias)
+        self.assertIn(post.pk, self.ids('новые'))
+        post = Post.objects.create(text='Свежие кошки', author=self.author)
+        self.assertEqual(self.ids('свежие'), [post.pk])
+
+    def test_search_view_paginates(self):
+        """Страница поиска делится на страницы и хранит запрос в ссылках."""
+        Post.objects.bulk_create(
+            Post(text=f'Кошки {i}', author=self.author)
+            for i in range(NUMBER_OF_POSTS)
+        )
+        response = self.client.get(reverse('posts:search'), {'q': 'кошки'})
+        self.assertEqual(len(response.context['page_obj']), NUMBER_OF_POSTS)
+        self.assertEqual(response.context['paginator'].count,
+                         NUMBER_OF_POSTS + 2)
+        self.assertContains(
+            response, 'q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B8&amp;page=2'
+        )
+
+    @override_settings(SEARCH_MAX_RESULTS=NUMBER_OF_POSTS + 1)
+    def test_search_depth_capped(self):
+        """Считаются и листаются только первые SEARCH_MAX_RESULTS."""
+        Post.objects.bulk_create(
+            Post(text=f'Кошки {i}', author=self.author)
+            for i in range(NUMBER_OF_POSTS * 2)
+        )
+        results = SearchResults('кошки')
+        self.assertEqual(results.count(), NUMBER_OF_POSTS + 1)
+        self.assertTrue(results.truncated)
+        self.assertEqual(len(results[NUMBER_OF_POSTS:NUMBER_OF_POSTS * 2]), 1)
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'кошки', 'page': 3}
+        )
+        self.assertEqual(response.context['page_obj'].number, 2)
+        self.assertContains(
+            response, f'Найдено записей: больше {NUMBER_OF_POSTS + 1}'
+        )
+
+    @override_settings(SEARCH_MAX_RESULTS=2)
+    def test_exact_cap_not_truncated(self):
+        """Ровно SEARCH_MAX_RESULTS совпадений — не «больше»."""
+        results = SearchResults('кошки')
+        self.assertEqual(results.count(), 2)
+        self.assertFalse(results.truncated)
+        response = self.client.get(reverse('posts:search'), {'q': 'кошки'})
+        self.assertContains(response, 'Найдено записей: 2')
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через тот же индекс."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собак'}
+        )
+        self.assertEqual(
+            [post.pk for post in response.context['cl'].result_list],
+            [self.long.pk],
+        )
@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings, TestCase
+
+from ..models import MediaBlob, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded(name):
+    return SimpleUploadedFile(
+        name=name, content=SMALL_GIF, content_type='image/gif'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_SYNC=True)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, name):
+        post = Post.objects.create(
+            author=self.author, text='Пост', image=uploaded(name)
+        )
+        # Миниатюру и варианты записывает в базу render_images.
+        post.refresh_from_db()
+        return post
+
+    def gc_media(self, *args):
+        call_command('gc_media', '--grace', '0', *args, stdout=StringIO())
+
+    def test_same_image_stored_once(self):
+        """Одинаковые картинки хранятся одним файлом с общей миниатюрой."""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.GIF')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.thumbnail_url)
+        self.assertEqual(first.thumbnail_url, second.thumbnail_url)
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).refs, 2)
+        directory = os.path.dirname(first.image.path)
+        self.assertEqual(os.listdir(directory), [
+            os.path.basename(first.image.name)
+        ])
+
+    def test_concurrent_same_upload(self):
+        """Гонка двух одинаковых загрузок даёт один файл, а не зависание."""
+        storage = Post._meta.get_field('image').storage
+        # Обе загрузки проверили exists() до того, как файл появился.
+        with mock.patch.object(storage, 'exists', return_value=False):
+            first = storage.save('posts/first.gif', ContentFile(SMALL_GIF))
+            second = storage.save('posts/second.gif', ContentFile(SMALL_GIF))
+        self.assertEqual(first, second)
+        directory = os.path.dirname(storage.path(first))
+        self.assertEqual(os.listdir(directory), [os.path.basename(first)])
+
+    def test_refs_follow_posts(self):
+        """Удаление и замена картинки уменьшают число ссылок."""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.gif')
+        name = first.image.name
+        first.delete()
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
+        second.image = None
+        second.save()
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 0)
+
+    def test_gc_removes_only_unreferenced(self):
+        """gc_media удаляет файл, только когда на него не осталось ссылок."""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.gif')
+        path = first.image.path
+        first.delete()
+        self.gc_media()
+        self.assertTrue(os.path.exists(path))
+        second.delete()
+        self.gc_media()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_gc_removes_derived_files(self):
+        """Вместе с файлом удаляются его миниатюра и варианты."""
+        post = self.create_post('first.gif')
+        blob = MediaBlob.objects.get(name=post.image.name)
+        derived = [
+            os.path.join(TEMP_MEDIA_ROOT, name) for name in blob.derived_names
+        ]
+        derived.append(os.path.join(
+            TEMP_MEDIA_ROOT, post.thumbnail_url[len(settings.MEDIA_URL):]
+        ))
+        self.assertGreater(len(derived), 1)
+        for path in derived:
+            self.assertTrue(os.path.exists(path), path)
+        post.delete()
+        self.gc_media()
+        for path in derived:
+            self.assertFalse(os.path.exists(path), path)
+
+    def test_repair_restores_derived(self):
+        """--repair восстанавливает список вариантов по постам."""
+        post = self.create_post('first.gif')
+        blob = MediaBlob.objects.get(name=post.image.name)
+        names = blob.derived_names
+        MediaBlob.objects.update(derived='')
+        self.gc_media('--repair')
+        blob.refresh_from_db()
+        self.assertEqual(blob.derived_names, names)
+
+    def test_gc_grace_period(self):
+        """Недавно освободившийся файл сборщик не трогает."""
+        post = self.create_post('first.gif')
+        path = post.image.path
+        post.delete()
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(os.path.exists(path))
+
+    def test_repair_restores_refs(self):
+        """--repair пересчитывает ссылки по постам."""
+        post = self.create_post('first.gif')
+        MediaBlob.objects.all().delete()
+        self.gc_media('--repair')
+        self.assertEqual(MediaBlob.objects.get(name=post.image.name).refs, 1)
+        self.assertTrue(os.path.exists(post.image.path))
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import shutil
+import struct
+import tempfile
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings, RequestFactory, TestCase
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post
+from ..uploads import (
+    EXIF_ORIENTATION, ingest_metrics, LimitedImageUploadHandler
+)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def png_chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data)))
+
+
+def png_bomb(side=30000):
+    """Заголовок PNG на side×side пикселей при паре сотен байт данных."""
+    header = struct.pack('>IIBBBBB', side, side, 8, 0, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header)
+            + png_chunk(b'IDAT', zlib.compress(b'\x00' * 1000))
+            + png_chunk(b'IEND', b''))
+
+
+def rotated_jpeg(width=300, height=100):
+    """JPEG с EXIF: камера держалась боком, картинку надо повернуть."""
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    exif[0x010F] = 'Camera'
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(
+        buffer, 'JPEG', quality=100, exif=exif.tobytes()
+    )
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class UploadLimitsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def create_post(self, name, content):
+        return self.authorized_client.post(reverse('posts:create_post'), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content),
+        })
+
+    def assert_rejected(self, response, message):
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(message, response.context['form'].errors['image'][0])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_BYTES=20)
+    def test_too_many_bytes(self):
+        """Файл больше лимита отклоняется с понятной ошибкой."""
+        self.assert_rejected(
+            self.create_post('small.gif', SMALL_GIF), 'Файл больше'
+        )
+
+    def test_decompression_bomb(self):
+        """Огромная по заголовку картинка не доходит до декодирования."""
+        self.assert_rejected(
+            self.create_post('bomb.png', png_bomb()), 'слишком большая'
+        )
+
+    def test_small_image_accepted(self):
+        """Картинка в пределах лимитов сохраняется."""
+        self.create_post('small.gif', SMALL_GIF)
+        self.assertTrue(Post.objects.get().image)
+
+    def test_csrf_still_checked(self):
+        """Смена обработчиков загрузки не отключает проверку CSRF."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.author)
+        response = client.post(reverse('posts:create_post'), {
+            'text': 'Пост без токена',
+        })
+        self.assertTemplateUsed(response, 'core/403csrf.html')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_BYTES=20)
+    def test_other_uploads_not_limited(self):
+        """Загрузки мимо форм поста идут через обработчики Django."""
+        request = RequestFactory().post('/', {
+            'file': SimpleUploadedFile('small.gif', SMALL_GIF),
+        })
+        self.assertEqual(request.FILES['file'].read(), SMALL_GIF)
+
+    def test_hash_computed_while_streaming(self):
+        """Обработчик считает sha256 по мере прихода данных."""
+        handler = LimitedImageUploadHandler()
+        handler.new_file('image', 'small.gif', 'image/gif', len(SMALL_GIF))
+        for start in range(0, len(SMALL_GIF), 8):
+            handler.receive_data_chunk(SMALL_GIF[start:start + 8], start)
+        upload = handler.file_complete(len(SMALL_GIF))
+        self.assertIsNone(upload.upload_error)
+        self.assertEqual(upload.sha256, hashlib.sha256(SMALL_GIF).hexdigest())
+        self.assertEqual(upload.read(), SMALL_GIF)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_IMAGE_MAX_SIDE=64)
+class ImageNormalizationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        cache.clear()
+
+    def create_post(self, name, content):
+        self.authorized_client.post(reverse('posts:create_post'), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content),
+        })
+        return Post.objects.get()
+
+    def test_photo_normalized(self):
+        """Фото повёрнуто по EXIF, уменьшено и сохранено без метаданных."""
+        original = rotated_jpeg()
+        post = self.create_post('photo.JPG', original)
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        with Image.open(post.image.path) as stored:
+            self.assertEqual(stored.format, 'JPEG')
+            self.assertEqual(stored.size, (21, 64))
+            self.assertNotIn('exif', stored.info)
+        stats = ingest_metrics()
+        self.assertEqual(stats['images'], 1)
+        self.assertEqual(stats['bytes_in'], len(original))
+        self.assertEqual(stats['bytes_out'], post.image.size)
+        self.assertLess(stats['bytes_out'], stats['bytes_in'])
+
+    def test_gif_kept_as_is(self):
+        """GIF не пережимается и хранится байт в байт."""
+        post = self.create_post('small.gif', SMALL_GIF)
+        with post.image.open('rb') as stored:
+            self.assertEqual(stored.read(), SMALL_GIF)
+        self.assertEqual(ingest_metrics()['images'], 0)
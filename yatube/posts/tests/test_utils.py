@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Post
+from ..utils import FeedPaginator
+
+User = get_user_model()
+
+NUMB_OF_POSTS = 13
+PER_PAGE = 10
+
+
+class FeedPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.bulk_create([
+            Post(text=f'Тестовый пост {i}', author=cls.author)
+            for i in range(NUMB_OF_POSTS)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached(self):
+        """Количество постов берётся из кэша без COUNT(*)."""
+        FeedPaginator(Post.objects.all(), PER_PAGE).count
+        with self.assertNumQueries(0):
+            count = FeedPaginator(Post.objects.all(), PER_PAGE).count
+        self.assertEqual(count, NUMB_OF_POSTS)
+
+    def test_given_count_skips_query(self):
+        """Переданный счётчик используется вместо COUNT(*)."""
+        paginator = FeedPaginator(Post.objects.all(), PER_PAGE, count=42)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.num_pages, 5)
+
+    def test_stale_count_is_recounted(self):
+        """Устаревший счётчик не прячет существующие страницы."""
+        paginator = FeedPaginator(Post.objects.all(), PER_PAGE, count=1)
+        page = paginator.get_page(2)
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), NUMB_OF_POSTS - PER_PAGE)
+
+    def test_elided_page_range(self):
+        """Выводится только окно номеров страниц."""
+        paginator = FeedPaginator(Post.objects.all(), 1, count=100)
+        ellipsis = FeedPaginator.ELLIPSIS
+        self.assertEqual(
+            list(paginator.get_elided_page_range(50)),
+            [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)),
+            [1, 2, 3, ellipsis, 100],
+        )
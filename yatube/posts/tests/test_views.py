@@ -244,6 +244,68 @@ class PaginatorViewsTest(TestCase):
                 len(response.context['page_obj']), TEMP_NUMB_SECOND_PAGE
             )
 
+@override_settings(POSTS_PAGINATION='cursor')
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Описание',
+            slug='test-slug',
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Тестовый пост {i}', author=cls.author, group=cls.group)
+            for i in range(NUMB_OF_POSTS)
+        ])
+
+        cls.authorized_auth = Client()
+        cls.authorized_auth.force_login(cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages(self):
+        """Курсорная пагинация листает ленту вперёд и назад."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.authorized_auth.get(url).context['page_obj']
+                self.assertEqual(len(first), TEMP_NUMB_FIRST_PAGE)
+                self.assertFalse(first.has_previous())
+                self.assertTrue(first.has_next())
+
+                second = self.authorized_auth.get(
+                    url, {'after': first.next_cursor}
+                ).context['page_obj']
+                self.assertEqual(len(second), TEMP_NUMB_SECOND_PAGE)
+                self.assertFalse(second.has_next())
+                self.assertFalse(
+                    set(p.id for p in first) & set(p.id for p in second)
+                )
+
+                back = self.authorized_auth.get(
+                    url, {'before': second.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual(
+                    [p.id for p in back], [p.id for p in first]
+                )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный токен отдаёт первую страницу."""
+        response = self.authorized_auth.get(
+            reverse('posts:index'), {'after': 'broken'}
+        )
+        self.assertEqual(
+            len(response.context['page_obj']), TEMP_NUMB_FIRST_PAGE
+        )
+
+
 class CacheViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -265,13 +327,18 @@ class CacheViewsTest(TestCase):
         cls.authorized_auth = Client()
         cls.authorized_auth.force_login(cls.author)
 
+    def setUp(self):
+        # База откатывается после каждого теста, а кэш — нет.
+        cache.clear()
+
     def test_cache_index(self):
         """Проверка хранения и очищения кэша для index."""
         response = CacheViewsTest.authorized_auth.get(reverse('posts:index'))
         posts = response.content
-        Post.objects.create(
-            text='Новый тестовый пост',
-            author=CacheViewsTest.author,
+        Post.objects.filter(pk=CacheViewsTest.post.pk).update(
+            text='Изменено в обход сигналов',
+            text_html='Изменено в обход сигналов',
+            preview_html='Изменено в обход сигналов',
         )
         response_old = CacheViewsTest.authorized_auth.get(
             reverse('posts:index')
@@ -287,6 +354,99 @@ class CacheViewsTest(TestCase):
         new_posts = response_new.content
         self.assertNotEqual(old_posts, new_posts, 'Нет сброса кэша.')
 
+    def test_new_post_invalidates_index_cache(self):
+        """Новый пост сразу виден на закэшированной главной."""
+        CacheViewsTest.authorized_auth.get(reverse('posts:index'))
+        Post.objects.create(
+            text='Новый тестовый пост',
+            author=CacheViewsTest.author,
+        )
+        response = CacheViewsTest.authorized_auth.get(reverse('posts:index'))
+        self.assertContains(response, 'Новый тестовый пост')
+
+    def test_follow_cache_is_per_user(self):
+        """Кэш ленты подписок не отдаётся другому пользователю."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=CacheViewsTest.author)
+        client = Client()
+        client.force_login(follower)
+        self.assertContains(
+            client.get(reverse('posts:follow_index')), 'Тестовый пост'
+        )
+        self.assertNotContains(
+            CacheViewsTest.authorized_auth.get(reverse('posts:follow_index')),
+            'Тестовый пост',
+        )
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            description='Описание',
+            slug='test-slug'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.author}),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.id}),
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_unchanged_pages_return_304(self):
+        """Неизменившаяся страница отдаёт 304 без рендеринга."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(response.content, b'')
+
+    def test_changes_invalidate_etag(self):
+        """Новый комментарий меняет ETag всех страниц с постом."""
+        etags = {url: self.guest_client.get(url)['ETag'] for url in self.urls}
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_rename_and_render_version_invalidate_etag(self):
+        """Новое имя автора и новая версия разметки меняют ETag."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        etag = self.guest_client.get(url)['ETag']
+        self.author.first_name = 'Новое имя'
+        self.author.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        etag = response['ETag']
+        with override_settings(RENDER_VERSION='next'):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_viewer(self):
+        """ETag зависит от пользователя."""
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
 class CommentViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FEED_DEFERRED_FIELDS, Follow, Post, TimelineEntry
+
+
+def make_entry(user_id, post):
+    return TimelineEntry(
+        user_id=user_id,
+        post_id=post.pk,
+        author_id=post.author_id,
+        pub_date=post.pub_date,
+    )
+
+
+def trim(users):
+    """Оставляет в лентах пользователей не больше TIMELINE_MAX_ENTRIES.
+
+    users — id или запрос, который их выбирает. Лишние записи всех лент
+    удаляются одним DELETE: номер записи в ленте считает оконная функция
+    по индексу (user, pub_date, post).
+    """
+    entries = TimelineEntry.objects.filter(user_id__in=users).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('user_id')],
+            order_by=[F('pub_date').desc(), F('post_id').desc()],
+        )
+    ).order_by().values('pk', 'position')
+    sql, params = entries.query.sql_with_params()
+    connection = connections[router.db_for_write(TimelineEntry)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {TimelineEntry._meta.db_table} WHERE id IN '
+            f'(SELECT id FROM ({sql}) WHERE position > %s)',
+            (*params, settings.TIMELINE_MAX_ENTRIES),
+        )
+
+
+def fan_out(post):
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        'user_id', flat=True
+    )
+    TimelineEntry.objects.bulk_create(
+        (make_entry(user_id, post) for user_id in followers),
+        ignore_conflicts=True,
+    )
+    trim(followers)
+
+
+def backfill(user_id, author_id):
+    posts = Post.objects.filter(author_id=author_id).only(
+        'pk', 'author', 'pub_date'
+    )[:settings.TIMELINE_MAX_ENTRIES]
+    TimelineEntry.objects.bulk_create(
+        (make_entry(user_id, post) for post in posts),
+        ignore_conflicts=True,
+    )
+    trim([user_id])
+
+
+def unfollow(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()
+
+
+class TimelineFeed:
+    """Лента подписок из материализованных записей TimelineEntry.
+
+    Сортировка и отбор по ключу идут по индексу
+    (user, pub_date, post) самой записи, пост с автором и группой
+    подтягивается тем же запросом.
+    """
+
+    ordered = True
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def entries(self):
+        return TimelineEntry.objects.filter(user_id=self.user_id)
+
+    def count(self):
+        return self.entries().count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step is not None:
+                raise ValueError('Шаг среза не поддерживается.')
+            return self._posts(self._rows(self.entries())[index])
+        return self[index:index + 1][0]
+
+    def keyset_rows(self, key, descending, limit):
+        entries = self.entries()
+        if descending:
+            entries = entries.order_by('-pub_date', '-post_id')
+        else:
+            entries = entries.order_by('pub_date', 'post_id')
+        if key is not None:
+            pub_date, pk = key
+            if descending:
+                entries = entries.filter(
+                    Q(pub_date__lt=pub_date)
+                    | Q(pub_date=pub_date, post_id__lt=pk)
+                )
+            else:
+                entries = entries.filter(
+                    Q(pub_date__gt=pub_date)
+                    | Q(pub_date=pub_date, post_id__gt=pk)
+                )
+        return self._posts(self._rows(entries)[:limit])
+
+    def _rows(self, entries):
+        return entries.select_related('post__author', 'post__group').defer(
+            *(f'post__{field}' for field in FEED_DEFERRED_FIELDS)
+        )
+
+    def _posts(self, entries):
+        return [entry.post for entry in entries]
+
+
+@receiver(post_save, sender=Post)
+def fan_out_created_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_followed_author(sender, instance, created, raw=False,
+                             **kwargs):
+    if created and not raw:
+        backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_unfollowed_author(sender, instance, **kwargs):
+    unfollow(instance.user_id, instance.author_id)
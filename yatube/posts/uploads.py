@@ -0,0 +1,180 @@
+import hashlib
+import io
+import warnings
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps
+
+from core import metrics
+
+# Столько байт начала файла хватает, чтобы прочитать размеры картинки
+# почти любого формата; дальше ждать заголовка бессмысленно.
+HEADER_BYTES: int = 64 * 1024
+
+# Форматы, которые пережимаются при загрузке. GIF и остальные (часто
+# анимированные или палитровые) хранятся как есть.
+NORMALIZED_FORMATS = ('JPEG', 'PNG', 'WEBP')
+METADATA = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment')
+EXIF_ORIENTATION = 0x0112
+
+INGEST_METRICS = ('images', 'bytes_in', 'bytes_out')
+INGEST_METRICS_KEY = 'ingest_metrics:'
+
+
+def pixels_error(width, height):
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        return ('Картинка слишком большая: не больше '
+                f'{settings.POST_IMAGE_MAX_PIXELS} пикселей.')
+    return None
+
+
+def bytes_error():
+    return f'Файл больше {filesizeformat(settings.POST_IMAGE_MAX_BYTES)}.'
+
+
+def read_size(head):
+    """Размеры картинки по началу файла без декодирования пикселей."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        try:
+            with Image.open(io.BytesIO(head)) as image:
+                return image.size
+        except Image.DecompressionBombError:
+            # Pillow сам отказался открывать: размер заведомо огромный.
+            return float('inf'), 1
+        except Exception:
+            return None
+
+
+class LimitedImageUploadHandler(TemporaryFileUploadHandler):
+    """Потоковая загрузка с лимитами, проверяемыми по мере прихода данных.
+
+    Файл сразу пишется во временный файл, а не копится в памяти. Как
+    только размер превышает POST_IMAGE_MAX_BYTES или заголовок картинки
+    обещает больше POST_IMAGE_MAX_PIXELS пикселей, остаток не пишется и
+    не декодируется; причина отказа попадает в upload_error файла, и её
+    показывает форма. Попутно считается sha256 содержимого.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+        self.head = b''
+        self.error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error is not None:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_BYTES:
+            self.error = bytes_error()
+            return None
+        if self.head is not None:
+            self.check_header(raw_data)
+            if self.error is not None:
+                return None
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self, raw_data):
+        self.head += raw_data
+        size = read_size(self.head)
+        if size is not None:
+            self.head = None
+            self.error = pixels_error(*size)
+        elif len(self.head) >= HEADER_BYTES:
+            # Формат не узнали — решит валидация ImageField.
+            self.head = None
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        upload.upload_error = self.error
+        return upload
+
+
+def limited_image_uploads(view):
+    """Загрузки в view идут через LimitedImageUploadHandler.
+
+    Обработчики меняются до того, как кто-то прочтёт request.POST, а
+    CsrfViewMiddleware читает его раньше view, поэтому проверка CSRF
+    переносится внутрь обёртки.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        request.upload_handlers = [LimitedImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+    return wrapped
+
+
+def encoder_options(pil_format):
+    quality = settings.POST_IMAGE_QUALITY
+    return {
+        'JPEG': {'quality': quality, 'optimize': True, 'progressive': True},
+        'PNG': {'optimize': True},
+        'WEBP': {'quality': quality, 'method': 6},
+    }[pil_format]
+
+
+def ingest_metrics():
+    return metrics.read(INGEST_METRICS_KEY, INGEST_METRICS)
+
+
+def reset_ingest_metrics():
+    metrics.reset(INGEST_METRICS_KEY, INGEST_METRICS)
+
+
+def normalize_image(upload):
+    """Готовит оригинал к хранению.
+
+    Поворачивает по EXIF, уменьшает до POST_IMAGE_MAX_SIDE по большей
+    стороне, выбрасывает метаданные (цветовой профиль остаётся) и
+    пережимает с POST_IMAGE_QUALITY в том же формате. Если пережимать
+    нечего и файл меньше не становится, возвращается исходный.
+    """
+    upload.seek(0)
+    with Image.open(upload) as opened:
+        pil_format = opened.format
+        if (pil_format not in NORMALIZED_FORMATS
+                or getattr(opened, 'is_animated', False)):
+            upload.seek(0)
+            return upload
+        changed = (
+            any(key in opened.info for key in METADATA)
+            or opened.getexif().get(EXIF_ORIENTATION, 1) != 1
+        )
+        icc_profile = opened.info.get('icc_profile')
+        image = ImageOps.exif_transpose(opened)
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    if max(image.size) > max_side:
+        if image.mode in ('1', 'P'):
+            image = image.convert(
+                'RGBA' if 'transparency' in image.info else 'RGB'
+            )
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        changed = True
+    options = encoder_options(pil_format)
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    data = buffer.getvalue()
+    upload.seek(0)
+    keep = not changed and len(data) >= upload.size
+    metrics.record(INGEST_METRICS_KEY, 'images')
+    metrics.record(INGEST_METRICS_KEY, 'bytes_in', upload.size)
+    metrics.record(
+        INGEST_METRICS_KEY, 'bytes_out', upload.size if keep else len(data)
+    )
+    if keep:
+        return upload
+    return SimpleUploadedFile(upload.name, data, upload.content_type)
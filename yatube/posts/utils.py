@@ -1,10 +1,224 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core.routers import PRIMARY
 
 NUMBER_OF_POSTS: int = 10
 
+PAGINATION_PAGE: str = 'page'
+PAGINATION_CURSOR: str = 'cursor'
+
+
+def encode_cursor(post):
+    """Непрозрачный токен позиции в ленте по ключу (pub_date, id)."""
+    raw = f'{post.pub_date.isoformat()}|{post.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class FeedPage(Page):
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class FeedPaginator(Paginator):
+    """Paginator без точного COUNT(*) на каждый запрос.
+
+    Количество берётся из переданного счётчика или из кэша, где живёт
+    не дольше settings.PAGINATOR_COUNT_TIMEOUT секунд.
+    """
+
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        if count is not None:
+            self.__dict__['count'] = count
+        self._count_is_exact = False
+
+    @property
+    def count_cache_key(self):
+        query = str(self.object_list.query).encode()
+        return 'paginator_count:' + hashlib.md5(query).hexdigest()
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            return self._exact_count()
+        return count
+
+    def _exact_count(self):
+        if hasattr(self.object_list, 'query'):
+            # В кэш идёт счётчик с основной базы: отставшая реплика
+            # оставила бы там старое число до конца таймаута.
+            count = self.object_list.using(PRIMARY).count()
+            cache.set(self.count_cache_key, count,
+                      settings.PAGINATOR_COUNT_TIMEOUT)
+        else:
+            count = super().count
+        self._count_is_exact = True
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self._count_is_exact:
+                raise
+        # Устаревший счётчик не должен прятать существующие страницы.
+        self.count = self._exact_count()
+        self.__dict__.pop('num_pages', None)
+        return super().validate_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > (1 + on_each_side + on_ends) + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < (num_pages - on_each_side - on_ends) - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+
+class CursorPage(Page):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def is_cursor(self):
+        return True
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+def keyset_rows(posts, key=None, descending=True):
+    """Посты строго после ключа (pub_date, id) в порядке ленты."""
+    if descending:
+        posts = posts.order_by('-pub_date', '-pk')
+    else:
+        posts = posts.order_by('pub_date', 'pk')
+    if key is None:
+        return posts
+    pub_date, pk = key
+    if descending:
+        return posts.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    return posts.filter(
+        Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+    )
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация: страница N стоит столько же, сколько первая.
+
+    Не выполняет COUNT(*) и OFFSET, поэтому номеров страниц нет —
+    только ссылки «вперёд» и «назад» по токенам ?after= и ?before=.
+    """
+
+    def _rows(self, key, descending, limit):
+        posts = self.object_list
+        if hasattr(posts, 'keyset_rows'):
+            return posts.keyset_rows(key, descending, limit)
+        return list(keyset_rows(posts, key, descending)[:limit])
+
+    def get_cursor_page(self, after=None, before=None):
+        per_page = self.per_page
+        after = decode_cursor(after)
+        before = decode_cursor(before) if after is None else None
+        if before is not None:
+            rows = self._rows(before, False, per_page + 1)
+            if len(rows) <= per_page:
+                return self.get_cursor_page()
+            return CursorPage(rows[:per_page][::-1], self, True, True)
+        rows = self._rows(after, True, per_page + 1)
+        has_next = len(rows) > per_page
+        return CursorPage(rows[:per_page], self, has_next, after is not None)
+
 
-def get_page_context(posts, request):
-    paginator = Paginator(posts, NUMBER_OF_POSTS)
+def get_page_context(posts, request, count=None):
+    if settings.POSTS_PAGINATION == PAGINATION_CURSOR:
+        paginator = CursorPaginator(posts, NUMBER_OF_POSTS)
+        page_obj = paginator.get_cursor_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+        return {
+            'paginator': paginator,
+            'page_number': None,
+            'page_obj': page_obj,
+        }
+    paginator = FeedPaginator(posts, NUMBER_OF_POSTS, count=count)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return {
@@ -1,33 +1,46 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404, redirect, render
 from django.shortcuts import render
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
 
+from .etags import group_etag, index_etag, post_etag, profile_etag
+from .feeds import follow_feed, group_feed, index_feed, profile_feed
 from .forms import CommentForm, PostForm
-from .models import Group, Post, User, Follow
-from .utils import get_page_context
+from .generations import get_generations
+from .models import AuthorStats, Group, Post, User, Follow
+from .search import SearchResults
+from .uploads import limited_image_uploads
+from .utils import FeedPaginator, get_page_context, NUMBER_OF_POSTS
 
 
 User = get_user_model()
 
+@condition(etag_func=index_etag)
 def index(request):
     template: str = 'posts/index.html'
-    context = get_page_context(Post.objects.all(), request)
+    context = get_page_context(index_feed(), request)
+    context['cache_timeout'] = settings.FEED_CACHE_TIMEOUT
+    context['generation'] = get_generations(('posts',), ('groups',))
     return render(request, template, context)
 
 
+@condition(etag_func=group_etag)
 def group_posts(request, slug):
     template: str = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group_feed(group)
     context = {
         'group': group,
         'posts': posts,
     }
-    context.update(get_page_context(posts, request))
+    context.update(get_page_context(posts, request, group.posts_count))
     return render(request, template, context)
 
 
+@condition(etag_func=profile_etag)
 def profile(request, username):
     template: str = 'posts/profile.html'
     author = get_object_or_404(User, username=username)
@@ -36,23 +49,24 @@ def profile(request, username):
             user=request.user,
             author=author
         ).exists()
-    post_count = author.posts.count()
-    profile_list = author.posts.select_related('author', 'group')
+    post_count = AuthorStats.posts_count_for(author)
+    profile_list = profile_feed(author)
     context = {
         'author': author,
         'post_count': post_count,
         'following': following,
     }
-    context.update(get_page_context(profile_list, request))
+    context.update(get_page_context(profile_list, request, post_count))
     return render(request, template, context)
 
 
 
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
     template: str = 'posts/post_detail.html'
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm()
-    count_post = post.author.posts.count()
+    count_post = AuthorStats.posts_count_for(post.author_id)
     comments = post.comments.all()
     context = {
         'author': post.author,
@@ -64,10 +78,27 @@ def post_detail(request, post_id):
     return render(request, template, context)
 
 
+def search(request):
+    template: str = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    # Релевантность не ложится на ключ (pub_date, id), поэтому здесь
+    # всегда пагинация по номерам страниц.
+    paginator = FeedPaginator(SearchResults(query), NUMBER_OF_POSTS)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+        'paginator': paginator,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@limited_image_uploads
 @login_required
 def post_create(request):
     template: str = 'posts/create_post.html'
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method == 'POST' and form.is_valid():
         post_form = form.save(commit=False)
         post_form.author = request.user
@@ -76,6 +107,7 @@ def post_create(request):
     return render(request, template, {'form': form})
 
 
+@limited_image_uploads
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
@@ -124,8 +156,13 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    posts = Post.objects.filter(author__following__user=request.user)
+    # Поколения — до чтения ленты: свежее поколение переключает запрос
+    # на основную базу.
+    generation = get_generations(('follow', request.user.pk), ('groups',))
+    posts = follow_feed(request.user)
     context = get_page_context(posts, request)
+    context['cache_timeout'] = settings.FEED_CACHE_TIMEOUT
+    context['generation'] = generation
     return render(request, template, context)
 
 @login_required
@@ -50,7 +50,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -97,9 +99,44 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Keep connections across requests so pragmas are applied once.
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# Local read replicas: copies of the primary file refreshed by
+# `manage.py sync_replicas`. They mirror 'default' in tests.
+for replica in ('replica1', 'replica2'):
+    DATABASES[replica] = dict(
+        DATABASES['default'],
+        NAME=os.path.join(BASE_DIR, f'{replica}.sqlite3'),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Aliases that serve reads of safe requests, e.g. ('replica1', 'replica2')
+# once `sync_replicas` runs on a schedule. Empty: everything hits default.
+DATABASE_REPLICAS = ()
+# After a write the browser reads from the primary for this many seconds,
+# and so does any request that fills caches under a cache generation
+# younger than this; keep it above the replica sync interval.
+REPLICA_STICKY_SECONDS = 30
+
+# Applied by core.db to every new SQLite connection. WAL lets readers run
+# alongside the single writer; busy_timeout (ms) makes a writer wait for
+# the lock instead of failing at once. None skips a pragma.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative values are KiB: a 64 MB page cache per connection.
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+# Writes slower than this (seconds) are counted in the lock metrics.
+SQLITE_SLOW_WRITE = 0.2
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -135,6 +172,21 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# collectstatic writes content-hashed copies plus .gz/.br/.zst next to
+# them (.br/.zst need brotli and zstandard from requirements.txt; without
+# them only .gz is written). Without a manifest, URLs fall back to plain
+# names. With SERVE_STATIC, Django serves STATIC_ROOT itself:
+# precompressed copies, and hashed names as immutable (in DEBUG,
+# runserver's own static handler still takes precedence).
+STATICFILES_STORAGE = 'core.static.CompressedManifestStorage'
+SERVE_STATIC = True
+
+# Dynamic responses are compressed with the best of br/zstd/gzip the
+# client accepts. Compressed bytes of anonymous pages are cached by their
+# ETag for COMPRESSION_CACHE_TIMEOUT seconds.
+COMPRESSION_MIN_BYTES = 200
+COMPRESSION_CACHE_TIMEOUT = 60 * 10
 
 
 LOGIN_URL = 'users:login'
@@ -150,8 +202,73 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media') 
 
+# Feed pagination: 'page' (?page=N) or 'cursor' (?after=/?before= tokens,
+# no COUNT(*) and constant cost for deep pages).
+POSTS_PAGINATION = 'page'
+
+# Search counts and pages through at most this many best matches: past
+# that, COUNT(*) and OFFSET scan every match of a broad query, and nobody
+# reads that deep anyway.
+SEARCH_MAX_RESULTS = 1000
+
+# How long (seconds) a feed paginator may serve a cached post count.
+PAGINATOR_COUNT_TIMEOUT = 60
+
+# Follow feed source: 'join' (query through Follow), 'timeline'
+# (materialized per-user timeline filled on write) or 'merge' (k-way merge
+# of per-author index reads, no write amplification).
+FOLLOW_FEED_ENGINE = 'timeline'
+# Posts pulled per author at a time by the 'merge' engine.
+MERGE_FEED_BATCH_SIZE = 5
+
+# Lifetime of cached feed fragments. Their keys include data generations
+# bumped on every Post/Comment/Follow change, so this can be long.
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+# Part of every cache generation key and ETag. Empty: a digest of the
+# template files taken at process start, so changed templates start fresh
+# caches. Set it on deploys that change rendering outside templates.
+RENDER_VERSION = ''
+# Maximum timeline entries stored per user.
+TIMELINE_MAX_ENTRIES = 1000
+# Feeds show a stored preview of this many characters and never load the
+# full post text.
+POST_PREVIEW_CHARS = 500
+
+# Post image uploads (post create/edit and the post admin) stream to a
+# temporary file through posts.uploads.LimitedImageUploadHandler, which
+# stops writing as soon as the file exceeds POST_IMAGE_MAX_BYTES or its
+# header promises more than POST_IMAGE_MAX_PIXELS (decompression bombs),
+# and hashes the content on the fly. Other uploads use Django's handlers.
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+# Accepted JPEG/PNG/WebP originals are re-encoded before they are stored:
+# EXIF orientation applied, metadata stripped, the longer side capped at
+# POST_IMAGE_MAX_SIDE and lossy formats saved at POST_IMAGE_QUALITY.
+POST_IMAGE_MAX_SIDE = 2048
+POST_IMAGE_QUALITY = 85
+
+# Post thumbnails are rendered by a thread pool after the post is
+# committed; templates show the original image until the URL is stored.
+# THUMBNAIL_SYNC renders inline instead (handy for debugging).
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_SYNC = False
+
+# One SQLite file shared by every worker process on the host: template
+# fragments, generations and sessions are consistent across workers.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'default.sqlite3'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'MAX_SIZE': 256 * 1024 * 1024,
+        },
     }
-} 
\ No newline at end of file
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# `manage.py test` moves every cache to a throwaway directory, so test runs
+# and the dev server never share the file above.
+TEST_RUNNER = 'core.testing.TempCacheRunner'